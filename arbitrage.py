@@ -0,0 +1,388 @@
+"""
+Vectorized arbitrage core.
+
+Odds are stored as a NumPy matrix of providers x outcomes. The best two-way
+arbitrage is the best team 1 price and the best team 2 price offered by
+different providers, so instead of comparing every provider pair we take the
+top two prices per column, which is O(n) per match and runs for a whole sweep
+of matches in one batched call. solve_markets generalizes this to N-outcome
+markets (3-way, map handicaps, ...) with the top N prices per column, and
+allocate_portfolio sizes all arbitrages of a sweep together as one linear
+program under per-provider balances.
+"""
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from records import OddsTable, odds_table
+
+
+def parse_odds(teams, odds_data):
+    """
+    Convert scraped provider odds into an odds matrix.
+
+    Args:
+        teams (list): Team names as [team1, team2].
+        odds_data (list): List of provider odds as returned by scrape_match_odds.
+
+    Returns:
+        tuple: (provider names, float64 array of shape (providers, 2)).
+    """
+    table = OddsTable.from_odds_data(teams[:2], odds_data)
+    return list(table.providers), table.odds
+
+
+def pack_odds(matches):
+    """
+    Pad per-match odds matrices into one batch.
+
+    Args:
+        matches (list): (provider names, odds matrix) tuples as returned by parse_odds.
+
+    Returns:
+        tuple: (implied probabilities of shape (matches, providers, 2) with inf
+        padding, provider ids of shape (matches, providers) with -1 padding).
+        Rows sharing a provider name share an id, so they are never paired.
+    """
+    width = max((len(providers) for providers, _ in matches), default=0)
+    implied = np.full((len(matches), max(width, 1), 2), np.inf)
+    provider_ids = np.full((len(matches), max(width, 1)), -1, dtype=np.int64)
+
+    for m, (providers, odds) in enumerate(matches):
+        n = len(providers)
+        if not n:
+            continue
+        with np.errstate(divide='ignore'):
+            implied[m, :n] = 1 / odds
+        ids = {}
+        provider_ids[m, :n] = [ids.setdefault(name, len(ids)) for name in providers]
+
+    return implied, provider_ids
+
+
+def best_pairs(implied, provider_ids):
+    """
+    Find the lowest implied-probability sum per match across two different providers.
+
+    Ties are broken the same way as a nested provider loop would: lowest team 1
+    row first, then lowest team 2 row.
+
+    Args:
+        implied (ndarray): Implied probabilities of shape (matches, providers, 2).
+        provider_ids (ndarray): Provider ids of shape (matches, providers).
+
+    Returns:
+        tuple: (team 1 row, team 2 row, minimum sum) arrays of length matches.
+        The sum is inf when no valid pair exists.
+    """
+    rows = np.arange(implied.shape[0])
+    p1 = implied[:, :, 0]
+    p2 = implied[:, :, 1]
+
+    best1 = p1.argmin(axis=1)
+    best2 = p2.argmin(axis=1)
+    best_sum = p1[rows, best1] + p2[rows, best2]
+
+    # When both best prices come from the same provider, pair one of them with
+    # the best price of any other provider on the other outcome.
+    best1_id = provider_ids[rows, best1]
+    best2_id = provider_ids[rows, best2]
+    same = best1_id == best2_id
+
+    second2 = np.where(provider_ids != best1_id[:, None], p2, np.inf).argmin(axis=1)
+    second1 = np.where(provider_ids != best2_id[:, None], p1, np.inf).argmin(axis=1)
+    keep1_sum = p1[rows, best1] + p2[rows, second2]
+    keep2_sum = p1[rows, second1] + p2[rows, best2]
+    use_keep2 = (keep2_sum < keep1_sum) | ((keep2_sum == keep1_sum) & (second1 < best1))
+
+    team1_row = np.where(same & use_keep2, second1, best1)
+    team2_row = np.where(same & ~use_keep2, second2, best2)
+    min_sum = np.where(same, np.where(use_keep2, keep2_sum, keep1_sum), best_sum)
+
+    # Padding rows and single-provider matches have no valid pair
+    valid = (provider_ids[rows, team1_row] >= 0) & (provider_ids[rows, team2_row] >= 0)
+    valid &= provider_ids[rows, team1_row] != provider_ids[rows, team2_row]
+    min_sum = np.where(valid, min_sum, np.inf)
+
+    return team1_row, team2_row, min_sum
+
+
+def total_investment_result(providers, odds, team1_row, team2_row, min_sum, total_investment):
+    """Build the check_arbitrage result dict for a fixed total investment."""
+    odds1 = float(odds[team1_row, 0])
+    odds2 = float(odds[team2_row, 1])
+    return {
+        'team1_provider': providers[team1_row],
+        'team1_odds': odds1,
+        'team2_provider': providers[team2_row],
+        'team2_odds': odds2,
+        'arbitrage_percent': (1 - min_sum) * 100,
+        'total_investment': total_investment,
+        'stake_team1': total_investment / (min_sum * odds1),
+        'stake_team2': total_investment / (min_sum * odds2)
+    }
+
+
+def fixed_profit_result(providers, odds, team1_row, team2_row, min_sum, profit=10):
+    """Build the check_arbitrage_10_win result dict for a fixed guaranteed profit."""
+    odds1 = float(odds[team1_row, 0])
+    odds2 = float(odds[team2_row, 1])
+    arbitrage_percent = (1 - min_sum) * 100
+    required_total_investment = profit / (arbitrage_percent / 100)
+    return {
+        'team1_provider': providers[team1_row],
+        'team1_odds': odds1,
+        'team2_provider': providers[team2_row],
+        'team2_odds': odds2,
+        'arbitrage_percent': arbitrage_percent,
+        'required_investment': required_total_investment,
+        'stake_team1': (required_total_investment / min_sum) / odds1,
+        'stake_team2': (required_total_investment / min_sum) / odds2,
+        'guaranteed_profit': float(profit)
+    }
+
+
+def scan_arbitrage(matches, build_result, **kwargs):
+    """
+    Check many matches for arbitrage in one batched call.
+
+    Args:
+        matches (list): One OddsTable or (teams, odds_data) tuple per match.
+            Tables are used as they are; odds dicts are parsed first.
+        build_result (callable): total_investment_result or fixed_profit_result.
+        **kwargs: Passed to build_result (total_investment or profit).
+
+    Returns:
+        list: Result dict per match, or None where there is no arbitrage.
+    """
+    parsed = [
+        (match.providers, match.odds) if isinstance(match, OddsTable) else parse_odds(*match)
+        for match in matches
+    ]
+    if not parsed:
+        return []
+    team1_rows, team2_rows, min_sums = best_pairs(*pack_odds(parsed))
+
+    results = []
+    for (providers, odds), team1_row, team2_row, min_sum in zip(parsed, team1_rows, team2_rows, min_sums):
+        if min_sum < 1:
+            results.append(build_result(providers, odds, int(team1_row), int(team2_row), float(min_sum), **kwargs))
+        else:
+            results.append(None)
+    return results
+
+
+def market_from_odds_info(odds_info):
+    """
+    Convert a two-way scrape_match_odds result into a market for solve_markets.
+
+    Returns:
+        dict: 'outcomes' (names), 'providers' (names) and 'odds' (providers x outcomes array).
+    """
+    table = odds_table(odds_info)
+    return {'outcomes': list(table.teams), 'providers': list(table.providers), 'odds': table.odds}
+
+
+def _best_assignment(implied, provider_ids, distinct_providers):
+    """
+    Pick one provider row per outcome minimizing the implied-probability sum.
+
+    Args:
+        implied (ndarray): Shape (markets, providers, outcomes), inf where unavailable.
+        provider_ids (ndarray): Shape (markets, providers), -1 for padding.
+        distinct_providers (bool): Require a different provider for every outcome.
+
+    Returns:
+        tuple: (rows of shape (markets, outcomes), sums of shape (markets,)).
+    """
+    markets, width, outcomes = implied.shape
+    market_index = np.arange(markets)[:, None]
+    outcome_index = np.arange(outcomes)
+
+    if not distinct_providers:
+        rows = implied.argmin(axis=1)
+        return rows, implied[market_index, rows, outcome_index].sum(axis=1)
+
+    # With N outcomes, a provider can be blocked by at most N - 1 others, so
+    # only the N best prices per outcome can be part of the optimum.
+    k = min(outcomes, width)
+    candidates = np.argsort(implied, axis=1, kind='stable')[:, :k, :]
+    combos = np.indices((k,) * outcomes).reshape(outcomes, -1).T
+
+    rows = candidates[:, combos, outcome_index]
+    sums = implied[market_index[:, :, None], rows, outcome_index].sum(axis=2)
+    ids = provider_ids[market_index[:, :, None], rows]
+    valid = (ids >= 0).all(axis=2)
+    for a in range(outcomes):
+        for b in range(a + 1, outcomes):
+            valid &= ids[:, :, a] != ids[:, :, b]
+    sums = np.where(valid, sums, np.inf)
+
+    best = sums.argmin(axis=1)
+    return rows[np.arange(markets), best], sums[np.arange(markets), best]
+
+
+def solve_markets(markets, total_investment=None, profit=None, distinct_providers=True, allowed_providers=None):
+    """
+    Find arbitrages in N-outcome markets and size the stakes.
+
+    The best price per outcome is chosen subject to the provider constraints.
+    Stakes are proportional to 1 / odds, so every outcome pays the same amount.
+    Markets with the same number of outcomes are solved in one batched call.
+
+    Args:
+        markets (list): Dicts with 'outcomes', 'providers' and 'odds' (providers x
+            outcomes, NaN where a provider has no price), e.g. from market_from_odds_info.
+            An optional 'link' identifying the match is copied into its result.
+        total_investment (float, optional): Split this amount across the outcomes.
+        profit (float, optional): Size the stakes for this guaranteed profit instead.
+            Defaults to a total investment of 100 when neither is given.
+        distinct_providers (bool): Take every outcome from a different provider.
+        allowed_providers (set, optional): Only use these provider names.
+
+    Returns:
+        list: Result dict per market, or None where there is no arbitrage.
+    """
+    if total_investment is None and profit is None:
+        total_investment = 100
+
+    results = [None] * len(markets)
+    by_size = {}
+    for index, market in enumerate(markets):
+        by_size.setdefault(len(market['outcomes']), []).append(index)
+
+    for outcomes, indices in by_size.items():
+        # Collapse repeated provider names to their best price per outcome, so
+        # every provider appears once and only the top N rows per outcome matter
+        packed = []
+        for index in indices:
+            market = markets[index]
+            n = len(market['providers'])
+            odds = np.asarray(market['odds'], dtype=np.float64).reshape(n, outcomes)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                market_implied = np.where(odds > 1, 1 / odds, np.inf)
+            if allowed_providers is not None:
+                market_implied[[name not in allowed_providers for name in market['providers']]] = np.inf
+            names = list(dict.fromkeys(market['providers']))
+            if len(names) == n:
+                packed.append((market_implied, np.repeat(np.arange(n)[:, None], outcomes, axis=1)))
+                continue
+            position = {name: p for p, name in enumerate(names)}
+            best = np.full((len(names), outcomes), np.inf)
+            source_rows = np.zeros((len(names), outcomes), dtype=np.int64)
+            for row, name in enumerate(market['providers']):
+                p = position[name]
+                better = market_implied[row] < best[p]
+                best[p][better] = market_implied[row][better]
+                source_rows[p][better] = row
+            packed.append((best, source_rows))
+
+        width = max(max(len(best) for best, _ in packed), 1)
+        implied = np.full((len(indices), width, outcomes), np.inf)
+        provider_ids = np.full((len(indices), width), -1, dtype=np.int64)
+        for m, (best, _) in enumerate(packed):
+            implied[m, :len(best)] = best
+            provider_ids[m, :len(best)] = np.arange(len(best))
+
+        rows, sums = _best_assignment(implied, provider_ids, distinct_providers)
+
+        for m, index in enumerate(indices):
+            implied_sum = float(sums[m])
+            if not implied_sum < 1:
+                continue
+            market = markets[index]
+            source_rows = packed[m][1]
+            rows_m = [int(source_rows[p, k]) for k, p in enumerate(rows[m])]
+            odds = [float(market['odds'][row][k]) for k, row in enumerate(rows_m)]
+            # Every outcome pays total / implied_sum; profit is the payout minus the total
+            if profit is not None:
+                total = profit * implied_sum / (1 - implied_sum)
+            else:
+                total = total_investment
+            payout = total / implied_sum
+            results[index] = {
+                'outcomes': list(market['outcomes']),
+                'providers': [market['providers'][row] for row in rows_m],
+                'odds': odds,
+                'implied_sum': implied_sum,
+                'arbitrage_percent': (1 - implied_sum) * 100,
+                'total_investment': total,
+                'stakes': [payout / o for o in odds],
+                'payout': payout,
+                'guaranteed_profit': payout - total,
+            }
+            if 'link' in market:
+                results[index]['link'] = market['link']
+
+    return results
+
+
+def allocate_portfolio(opportunities, balances, bankroll=None):
+    """
+    Size the stakes of all arbitrages in a sweep to maximize total guaranteed profit.
+
+    Each opportunity i gets a payout P_i >= 0, paid whatever the outcome, by
+    staking P_i / odds on every outcome. That costs P_i * implied_sum and
+    guarantees P_i * (1 - implied_sum). Money is limited per provider, so the
+    linear program is
+
+        maximize    sum_i (1 - implied_sum_i) * P_i
+        subject to  sum of P_i / odds_ik over the bets placed at provider p <= balances[p]
+                    sum_i implied_sum_i * P_i <= bankroll (if given)
+
+    solved with the HiGHS solver in a few milliseconds for hundreds of opportunities.
+
+    Args:
+        opportunities (list): solve_markets results; None entries are skipped.
+        balances (dict): Money available per provider name. Providers missing
+            from it are treated as having no balance.
+        bankroll (float, optional): Cap on the total amount staked.
+
+    Returns:
+        list: Per opportunity, a copy of its result dict with 'total_investment',
+        'stakes', 'payout' and 'guaranteed_profit' set by the allocation, or None
+        where it gets no money.
+
+    Raises:
+        RuntimeError: If the solver fails.
+    """
+    indices = [i for i, opportunity in enumerate(opportunities) if opportunity is not None]
+    results = [None] * len(opportunities)
+    if not indices:
+        return results
+
+    implied_sums = np.array([opportunities[i]['implied_sum'] for i in indices])
+    provider_index = {}
+    rows, cols, coefficients = [], [], []
+    for col, i in enumerate(indices):
+        opportunity = opportunities[i]
+        for provider, odds in zip(opportunity['providers'], opportunity['odds']):
+            rows.append(provider_index.setdefault(provider, len(provider_index)))
+            cols.append(col)
+            coefficients.append(1 / odds)
+
+    # Repeated (provider, opportunity) entries are summed by the sparse matrix
+    a_ub = sparse.csr_matrix((coefficients, (rows, cols)), shape=(len(provider_index), len(indices)))
+    b_ub = np.array([max(balances.get(provider, 0.0), 0.0) for provider in provider_index])
+    if bankroll is not None:
+        a_ub = sparse.vstack([a_ub, sparse.csr_matrix(implied_sums[None, :])], format='csr')
+        b_ub = np.append(b_ub, max(bankroll, 0.0))
+
+    solution = linprog(-(1 - implied_sums), A_ub=a_ub, b_ub=b_ub, bounds=(0, None), method='highs')
+    if solution.status != 0:
+        raise RuntimeError(f"Portfolio allocation failed: {solution.message}")
+
+    for payout, i in zip(solution.x, indices):
+        # The solver returns values like 1e-12 for opportunities it leaves out
+        if payout <= 1e-9:
+            continue
+        opportunity = opportunities[i]
+        total = payout * opportunity['implied_sum']
+        results[i] = {
+            **opportunity,
+            'total_investment': total,
+            'stakes': [payout / odds for odds in opportunity['odds']],
+            'payout': payout,
+            'guaranteed_profit': payout - total,
+        }
+    return results
@@ -0,0 +1,935 @@
+"""
+Benchmarks for the HLTV scraper.
+
+Run one benchmark per invocation, e.g.:
+
+    python benchmark.py session --matches 10
+
+Results are printed to stdout; redirect to bench_output.txt to keep them.
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+import psutil
+
+from arbitrage import allocate_portfolio, best_pairs, pack_odds, solve_markets
+from http_backend import MATCHES_URL, create_http_session, fetch_page, parse_match_market, parse_match_odds, parse_upcoming_matches
+from http_cache import CachedSession
+from odds_store import OddsStore
+from output import LOG_FORMAT, NDJSONWriter, configure_logging
+from records import OddsTable, odds_table
+from replay import ReplaySession, report_sweep
+from watchlist import NearArbitrageWatchlist
+from main import (
+    DRIVER_PATH_CACHE,
+    DriverPool,
+    WebDriverCallCounter,
+    browser_session,
+    check_arbitrage_10_win_batch,
+    check_arbitrage_batch,
+    handle_cookie_consent,
+    profile_has_consent,
+    scrape_match_odds,
+    scrape_match_odds_http,
+    scrape_matches_for_days,
+    scrape_odds_for_matches,
+    scrape_odds_parallel,
+    scrape_odds_sharded,
+    setup_driver,
+    wait_for_match_list,
+    warm_up_driver,
+)
+
+
+class RssSampler:
+    """Sample the summed RSS of this process and all its children (Chrome, chromedriver)."""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        root = psutil.Process()
+        total = 0
+        for proc in [root] + root.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def print_latency_report(label, latencies, peak_bytes=None, wall=None):
+    """Print count, mean, median and max latency (seconds) for one benchmark run."""
+    print(f"{label}:")
+    if not latencies:
+        print("  no samples")
+        return
+    print(f"  matches:      {len(latencies)}")
+    print(f"  mean/match:   {statistics.mean(latencies):.3f}s")
+    print(f"  median/match: {statistics.median(latencies):.3f}s")
+    print(f"  max/match:    {max(latencies):.3f}s")
+    if wall is not None:
+        print(f"  wall time:    {wall:.3f}s")
+    if peak_bytes is not None:
+        print(f"  peak RSS:     {peak_bytes / (1024 * 1024):.1f} MiB")
+
+
+def get_match_urls(args):
+    """Return match URLs from the command line or from today's match list."""
+    if args.urls:
+        return args.urls[:args.matches]
+    matches = scrape_matches_for_days(days=1)
+    return [match['link'] for match in matches[:args.matches]]
+
+
+def bench_session(args):
+    """Compare one-driver-per-match (previous behaviour) with a single shared session."""
+    urls = get_match_urls(args)
+    if not urls:
+        print("No match URLs to benchmark.")
+        return
+
+    # Previous behaviour: every match started its own Chrome and never closed it.
+    latencies = []
+    drivers = []
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        try:
+            for url in urls:
+                t0 = time.perf_counter()
+                driver = setup_driver()
+                drivers.append(driver)
+                scrape_match_odds(driver, url)
+                latencies.append(time.perf_counter() - t0)
+        finally:
+            for driver in drivers:
+                driver.quit()
+        wall = time.perf_counter() - start
+    print_latency_report("driver per match", latencies, rss.peak_bytes, wall)
+
+    latencies = []
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        with browser_session() as driver:
+            for i, url in enumerate(urls):
+                t0 = time.perf_counter()
+                scrape_match_odds(driver, url, handle_consent=(i == 0))
+                latencies.append(time.perf_counter() - t0)
+        wall = time.perf_counter() - start
+    print_latency_report("shared session", latencies, rss.peak_bytes, wall)
+
+
+def bench_pool(args):
+    """Compare sweep wall time of the serial session with the worker pool."""
+    urls = get_match_urls(args)
+    if not urls:
+        print("No match URLs to benchmark.")
+        return
+    matches = [{'link': url} for url in urls]
+
+    start = time.perf_counter()
+    with browser_session() as driver:
+        serial = [odds_info for _, odds_info in scrape_odds_for_matches(driver, matches)]
+    serial_wall = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = [odds_info for _, odds_info in scrape_odds_parallel(matches, workers=args.workers)]
+    parallel_wall = time.perf_counter() - start
+
+    mismatches = [url for url, a, b in zip(urls, serial, parallel) if (a['teams'], a['odds']) != (b['teams'], b['odds'])]
+    print(f"matches:            {len(urls)}")
+    print(f"serial sweep:       {serial_wall:.3f}s")
+    print(f"pool sweep ({args.workers} workers): {parallel_wall:.3f}s")
+    print(f"speedup:            {serial_wall / parallel_wall:.2f}x")
+    print(f"identical results:  {not mismatches}")
+    for url in mismatches:
+        print(f"  differs: {url}")
+
+
+def make_replay_recording(fixture, count, match_list=None):
+    """
+    Write a temporary recording serving a saved match page under count match URLs.
+
+    Every URL gets its own copy of the page, so pages can be changed one by one.
+
+    Returns:
+        tuple: (recording directory, match dicts).
+    """
+    directory = tempfile.mkdtemp(prefix="recording_")
+    matches = [{'link': f"https://www.hltv.org/matches/{i}/bench"} for i in range(count)]
+    manifest = {}
+    for i, match in enumerate(matches):
+        shutil.copy(fixture, os.path.join(directory, f"match_{i}.html"))
+        manifest[match['link']] = f"match_{i}.html"
+    if match_list is not None:
+        shutil.copy(match_list, os.path.join(directory, "matches.html"))
+        manifest[MATCHES_URL] = "matches.html"
+    with open(os.path.join(directory, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return directory, matches
+
+
+def quiet_replay_session(directory):
+    """Replay session for a shard worker process, with the worker's per-match output silenced."""
+    logging.disable(logging.CRITICAL)
+    return ReplaySession(directory)
+
+
+def bench_shards(args):
+    """
+    Measure sweep throughput of the process-pool mode for several process counts.
+
+    The replay backend serves one saved match page under many match URLs, so the
+    run is offline and only measures fetching from memory plus lxml parsing.
+    The selenium and http backends scrape today's matches.
+    """
+    directory = None
+    if args.backend == "replay":
+        directory, matches = make_replay_recording(args.fixture, args.matches)
+        backend = "http"
+        factory = functools.partial(quiet_replay_session, directory)
+    else:
+        matches = [{'link': url} for url in get_match_urls(args)]
+        backend = args.backend
+        factory = create_http_session
+
+    print(f"cores: {os.cpu_count()}, matches: {len(matches)}, backend: {args.backend}")
+    try:
+        baseline = None
+        reference = None
+        for processes in args.processes:
+            start = time.perf_counter()
+            results = scrape_odds_sharded(matches, processes=processes, backend=backend,
+                                          single_pass=True, http_session_factory=factory)
+            wall = time.perf_counter() - start
+            baseline = baseline or wall
+            odds = [(odds_info['teams'], odds_info['odds']) for _, odds_info in results]
+            reference = reference or odds
+            print(f"{processes:>3} processes: {wall:7.2f}s  {len(results) / wall:8.1f} matches/s  "
+                  f"speedup {baseline / wall:5.2f}x  identical {odds == reference}")
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory)
+
+
+def time_first_page(label, get_driver, release_driver, handle_consent, runs):
+    """Time getting a driver and loading the match list with it, runs times."""
+    starts, pages = [], []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        driver = get_driver()
+        t1 = time.perf_counter()
+        try:
+            driver.get(MATCHES_URL)
+            if handle_consent:
+                handle_cookie_consent(driver)
+            wait_for_match_list(driver)
+        finally:
+            release_driver(driver)
+        starts.append(t1 - t0)
+        pages.append(time.perf_counter() - t1)
+    print(f"{label:<34} driver {statistics.mean(starts):6.2f}s  first page {statistics.mean(pages):6.2f}s  "
+          f"total {statistics.mean(starts) + statistics.mean(pages):6.2f}s")
+
+
+def bench_startup(args):
+    """
+    Compare cold and warm browser starts, up to a loaded match list.
+
+    cold:      chromedriver resolved by ChromeDriverManager, fresh profile, consent popup
+    cached:    cached chromedriver path, fresh profile, consent popup
+    profile:   cached path, reused profile with consent accepted, optional headless/blocking
+    pool:      driver borrowed from a DriverPool that was warmed up beforehand
+    """
+    options = {'headless': args.headless, 'block_resources': args.block_resources}
+    profile_root = tempfile.mkdtemp(prefix="profiles_")
+    quit_driver = lambda driver: driver.quit()
+    try:
+        def cold_driver():
+            if os.path.exists(DRIVER_PATH_CACHE):
+                os.remove(DRIVER_PATH_CACHE)
+            return setup_driver()
+        time_first_page("cold (resolve driver, new profile)", cold_driver, quit_driver, True, args.runs)
+        time_first_page("cached driver path", setup_driver, quit_driver, True, args.runs)
+
+        profile_dir = os.path.join(profile_root, "reused")
+        with browser_session(profile_dir=profile_dir, **options) as driver:
+            warm_up_driver(driver, profile_dir)
+        time_first_page(
+            "reused profile" + "".join(f" +{name}" for name, on in options.items() if on),
+            lambda: setup_driver(profile_dir=profile_dir, **options), quit_driver,
+            not profile_has_consent(profile_dir), args.runs
+        )
+
+        with DriverPool(size=1, profile_root=profile_root, **options) as pool:
+            # Wait until the pool has warmed its driver up
+            pool.release(pool.acquire())
+            time_first_page("warm pool", pool.acquire, pool.release, False, args.runs)
+    finally:
+        shutil.rmtree(profile_root, ignore_errors=True)
+
+
+def bench_cache(args):
+    """
+    Run several sweeps through the HTTP page cache against a replayed recording.
+
+    The replayed server answers conditional requests, and before every sweep
+    after the first a share of the match pages is changed. The match list is
+    served from the cache within its TTL and unchanged match pages are
+    revalidated with a 304.
+    """
+    recording, matches = make_replay_recording(args.fixture, args.matches, match_list=args.match_list)
+    cache_dir = tempfile.mkdtemp(prefix="http_cache_")
+    rng = random.Random(0)
+    try:
+        with CachedSession(None, cache_dir, list_ttl=args.list_ttl, match_ttl=args.match_ttl, max_bytes=args.max_bytes) as cache:
+            for sweep in range(args.sweeps):
+                if sweep:
+                    for i in rng.sample(range(len(matches)), int(len(matches) * args.changed)):
+                        with open(os.path.join(recording, f"match_{i}.html"), 'a', encoding='utf-8') as f:
+                            f.write(f"<!-- sweep {sweep} -->")
+                # A new replay session per sweep, so changed pages are read again
+                cache.session = ReplaySession(recording)
+                cache.reset_stats()
+                start = time.perf_counter()
+                parse_upcoming_matches(fetch_page(cache, MATCHES_URL))
+                for match in matches:
+                    parse_match_odds(fetch_page(cache, match['link']))
+                wall = time.perf_counter() - start
+                print(f"sweep {sweep + 1} ({wall * 1000:.0f} ms): {cache.summary(f'{len(matches) + 1} pages')}")
+    finally:
+        shutil.rmtree(recording)
+        shutil.rmtree(cache_dir)
+
+
+class CountingFileIO(io.FileIO):
+    """Raw file that counts its write calls, i.e. the write syscalls behind a buffered stream."""
+
+    writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def bench_output(args):
+    """
+    Measure the output cost of a replayed sweep in each output mode.
+
+    The offline sweep of --matches match pages runs once per mode and keeps the
+    log records emitted at that mode's level. The timed part is writing those
+    records and the report of the sweep, line buffered like a terminal, either to
+    a file or to a pipe drained by a reader thread (--pipe, as when piping a sweep
+    into another service). Page parsing is left out, since on a busy machine its
+    noise is larger than the output cost.
+
+    NDJSON needs far fewer write calls, but encoding the full provider odds makes
+    it slower than the text report at INFO level.
+    """
+    directory, matches = make_replay_recording(args.fixture, args.matches)
+    for i, match in enumerate(matches):
+        match.update({'date': '2025-01-02', 'time': '11:00', 'teams': [{'name': f"Team {i}A"}, {'name': f"Team {i}B"}]})
+    path = os.path.join(directory, "output.txt")
+
+    def sweep():
+        session = ReplaySession(directory)
+        odds = [scrape_match_odds_http(session, match['link']) for match in matches]
+        arbitrages = check_arbitrage_10_win_batch([odds_table(odds_info) for odds_info in odds])
+        return list(zip(matches, odds, arbitrages))
+
+    def write_output(records, results, ndjson):
+        reader = None
+        if args.pipe:
+            read_fd, write_fd = os.pipe()
+            reader = threading.Thread(target=lambda: [None for _ in iter(lambda: os.read(read_fd, 65536), b'')])
+            reader.start()
+            raw = CountingFileIO(write_fd, 'w')
+        else:
+            raw = CountingFileIO(path, 'w')
+        with io.TextIOWrapper(io.BufferedWriter(raw), encoding='utf-8', line_buffering=True) as out:
+            handler = logging.StreamHandler(out)
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            start = time.perf_counter()
+            for record in records:
+                handler.handle(record)
+            if ndjson:
+                with NDJSONWriter(out) as writer:
+                    report_sweep(results, writer)
+            else:
+                with contextlib.redirect_stdout(out):
+                    report_sweep(results)
+            seconds = time.perf_counter() - start
+        if reader is not None:
+            reader.join()
+            os.close(read_fd)
+            return seconds, raw.writes
+        return seconds, raw.writes
+
+    # (label, log level, NDJSON instead of the text report)
+    modes = [
+        ("text, DEBUG log", logging.DEBUG, False),
+        ("text, INFO log", logging.INFO, False),
+        ("ndjson, WARNING log", logging.WARNING, True),
+    ]
+    root = logging.getLogger()
+    saved_level, saved_handlers = root.level, root.handlers[:]
+    print(f"{args.matches} matches to a {'pipe' if args.pipe else 'file'}, best of {args.repeat}")
+    try:
+        for label, level, ndjson in modes:
+            records = []
+            collector = logging.Handler()
+            collector.emit = records.append
+            root.handlers = [collector]
+            root.setLevel(level)
+            results = sweep()
+            root.handlers = saved_handlers
+            root.setLevel(saved_level)
+
+            seconds, writes = min(write_output(records, results, ndjson) for _ in range(args.repeat))
+            print(f"  {label:<20} {seconds * 1000:7.1f} ms  {seconds / args.matches * 1e6:6.1f} us/match  "
+                  f"{len(records):5d} log records  {writes:5d} writes")
+    finally:
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+        shutil.rmtree(directory)
+
+
+def scraped_odds(odds_info):
+    """Return the parts of a scrape_match_odds result that two scrapes of one page must agree on (not 'scraped_at')."""
+    return odds_info['teams'], odds_info['odds'], odds_info.get('table')
+
+
+def bench_parse(args):
+    """Parse a saved match page with lxml and with Selenium and compare output and timing."""
+    path = os.path.abspath(args.fixture)
+    with open(path, encoding='utf-8') as f:
+        page_html = f.read()
+
+    lxml_result = parse_match_odds(page_html)
+    lxml_time = min(timeit.repeat(lambda: parse_match_odds(page_html), number=args.repeat, repeat=3)) / args.repeat
+    print(f"lxml parse:     {lxml_time * 1000:.3f} ms/page")
+
+    if args.skip_selenium:
+        print(f"lxml result:    {lxml_result}")
+        return
+
+    with browser_session() as driver:
+        driver.get(f"file://{path}")
+        selenium_times = []
+        for _ in range(args.selenium_repeat):
+            t0 = time.perf_counter()
+            selenium_result = scrape_match_odds(driver, f"file://{path}", handle_consent=False)
+            selenium_times.append(time.perf_counter() - t0)
+    print(f"selenium parse: {statistics.median(selenium_times) * 1000:.3f} ms/page (includes page load)")
+    identical = scraped_odds(lxml_result) == scraped_odds(selenium_result)
+    print(f"identical results: {identical}")
+    if not identical:
+        print(f"  lxml:     {lxml_result}")
+        print(f"  selenium: {selenium_result}")
+
+
+def bench_calls(args):
+    """Count WebDriver round trips per page for per-element vs single-pass extraction."""
+    urls = [f"file://{os.path.abspath(args.fixture)}"] + args.urls
+    with browser_session() as driver:
+        for i, url in enumerate(urls):
+            results = {}
+            for single_pass in (False, True):
+                with WebDriverCallCounter(driver) as calls:
+                    t0 = time.perf_counter()
+                    results[single_pass] = scrape_match_odds(driver, url, handle_consent=(i == 1), single_pass=single_pass)
+                    elapsed = time.perf_counter() - t0
+                mode = "single pass" if single_pass else "per element"
+                print(f"{url}\n  {mode}: {calls.total} calls, {elapsed * 1000:.1f} ms")
+            print(f"  identical results: {scraped_odds(results[False]) == scraped_odds(results[True])}")
+
+        if args.match_list:
+            results = {}
+            for single_pass in (False, True):
+                with WebDriverCallCounter(driver) as calls:
+                    t0 = time.perf_counter()
+                    results[single_pass] = scrape_matches_for_days(days=args.days, driver=driver, single_pass=single_pass)
+                    elapsed = time.perf_counter() - t0
+                mode = "single pass" if single_pass else "per element"
+                print(f"match list ({len(results[single_pass])} matches)\n  {mode}: {calls.total} calls, {elapsed:.2f} s")
+            print(f"  identical results: {results[False] == results[True]}")
+
+
+def legacy_check_arbitrage(teams, odds_data, total_investment=100):
+    """Reference O(n^2) provider pair loop that check_arbitrage used before the vectorized core."""
+    team1, team2 = teams[0], teams[1]
+    providers = []
+    for entry in odds_data:
+        try:
+            providers.append({
+                'provider': entry['provider'],
+                team1: float(entry[team1].replace(',', '.')),
+                team2: float(entry[team2].replace(',', '.'))
+            })
+        except (KeyError, ValueError):
+            continue
+
+    min_sum = float('inf')
+    best_pair = None
+    for p1 in providers:
+        for p2 in providers:
+            if p1['provider'] == p2['provider']:
+                continue
+            sum_inv = (1 / p1[team1]) + (1 / p2[team2])
+            if sum_inv < min_sum:
+                min_sum = sum_inv
+                best_pair = (p1, p2)
+
+    if min_sum < 1:
+        return {
+            'team1_provider': best_pair[0]['provider'],
+            'team1_odds': best_pair[0][team1],
+            'team2_provider': best_pair[1]['provider'],
+            'team2_odds': best_pair[1][team2],
+            'arbitrage_percent': (1 - min_sum) * 100,
+            'total_investment': total_investment,
+            'stake_team1': total_investment / (min_sum * best_pair[0][team1]),
+            'stake_team2': total_investment / (min_sum * best_pair[1][team2])
+        }
+    return None
+
+
+def generate_sweep(matches, providers, seed=0):
+    """Generate a synthetic sweep of (teams, odds_data) tuples with scraped-style odds strings."""
+    rng = random.Random(seed)
+    sweep = []
+    for m in range(matches):
+        teams = [f"Team {m}A", f"Team {m}B"]
+        fair = rng.uniform(0.2, 0.8)
+        odds_data = []
+        for p in range(providers):
+            margin = rng.uniform(1.0, 1.08)
+            odds_data.append({
+                "provider": f"Provider {p}",
+                teams[0]: f"{1 / (fair * margin):.2f}",
+                teams[1]: f"{1 / ((1 - fair) * margin):.2f}",
+            })
+        sweep.append((teams, odds_data))
+    return sweep
+
+
+def bench_arbitrage(args):
+    """Time the nested provider loop against the batched NumPy scan on a synthetic sweep."""
+    sweep = generate_sweep(args.matches, args.providers)
+    print(f"sweep: {args.matches} matches x {args.providers} providers")
+
+    t0 = time.perf_counter()
+    legacy = [legacy_check_arbitrage(teams, odds_data) for teams, odds_data in sweep]
+    legacy_time = time.perf_counter() - t0
+    print(f"nested loop:     {legacy_time * 1000:.1f} ms")
+
+    batch_time = min(timeit.repeat(lambda: check_arbitrage_batch(sweep), number=1, repeat=args.repeat))
+    batched = check_arbitrage_batch(sweep)
+    print(f"batched numpy:   {batch_time * 1000:.1f} ms")
+    print(f"speedup:         {legacy_time / batch_time:.1f}x")
+    print(f"arbitrages:      {sum(result is not None for result in batched)}")
+    print(f"identical results: {legacy == batched}")
+
+
+def bench_store(args):
+    """Fill an odds store with synthetic polling history and time range queries against it."""
+    sweep = generate_sweep(args.matches, args.providers)
+    directory = tempfile.mkdtemp(prefix="odds_store_")
+    try:
+        with OddsStore(directory) as store:
+            t0 = time.perf_counter()
+            now = time.time()
+            start = now - args.polls * args.interval
+            for poll in range(args.polls):
+                for m, (teams, odds_data) in enumerate(sweep):
+                    store.append(f"match-{m}", {'teams': teams, 'odds': odds_data}, timestamp=start + poll * args.interval)
+            write_time = time.perf_counter() - t0
+
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"rows:          {store.rows}")
+        print(f"write:         {write_time:.2f}s ({store.rows / write_time:,.0f} rows/s)")
+        print(f"size on disk:  {size / (1024 * 1024):.1f} MiB ({size / store.rows:.1f} bytes/row)")
+
+        with OddsStore(directory) as store:
+            query = lambda: store.query("match-0", provider="Provider 0", start=now - 3600)
+            hits = len(query()['timestamp'])
+            query_time = min(timeit.repeat(query, number=10, repeat=3)) / 10
+            print(f"last hour, one match + provider: {query_time * 1000:.2f} ms ({hits} rows)")
+            query = lambda: store.query("match-0")
+            hits = len(query()['timestamp'])
+            query_time = min(timeit.repeat(query, number=3, repeat=3)) / 3
+            print(f"full history, one match:         {query_time * 1000:.2f} ms ({hits} rows)")
+    finally:
+        shutil.rmtree(directory)
+
+
+def bench_records(args):
+    """
+    Compare odds dicts with OddsTables on a day of polled snapshots.
+
+    Every poll produces fresh strings, as a scrape would. Memory is what the
+    snapshots keep alive (tracemalloc); throughput is one batched arbitrage
+    scan per poll over all matches.
+    """
+    polls = [generate_sweep(args.matches, args.providers, seed=poll) for poll in range(args.polls)]
+    rows = args.polls * args.matches * args.providers
+    print(f"day of snapshots: {args.polls} polls x {args.matches} matches x {args.providers} providers ({rows:,} rows)")
+
+    tracemalloc.start()
+    dicts = [[(teams, odds_data) for teams, odds_data in generate_sweep(args.matches, args.providers, seed=poll)]
+             for poll in range(args.polls)]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dicts
+
+    # Tables are built at scrape time, so the odds dicts they come from are not kept
+    tracemalloc.start()
+    tables = [[OddsTable.from_odds_data(teams, odds_data) for teams, odds_data in generate_sweep(args.matches, args.providers, seed=poll)]
+              for poll in range(args.polls)]
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"memory, dicts:   {dict_bytes / (1024 * 1024):8.1f} MiB ({dict_bytes / rows:.0f} bytes/row)")
+    print(f"memory, tables:  {table_bytes / (1024 * 1024):8.1f} MiB ({table_bytes / rows:.0f} bytes/row)")
+
+    dict_time = min(timeit.repeat(lambda: [check_arbitrage_batch(sweep) for sweep in polls], number=1, repeat=args.repeat))
+    table_time = min(timeit.repeat(lambda: [check_arbitrage_batch(sweep) for sweep in tables], number=1, repeat=args.repeat))
+    identical = [check_arbitrage_batch(sweep) for sweep in polls] == [check_arbitrage_batch(sweep) for sweep in tables]
+    print(f"arbitrage scans, dicts:  {dict_time:.2f}s ({rows / dict_time:,.0f} rows/s)")
+    print(f"arbitrage scans, tables: {table_time:.2f}s ({rows / table_time:,.0f} rows/s)")
+    print(f"identical results: {identical}")
+
+
+def generate_markets(markets, providers, outcomes, seed=0):
+    """Generate synthetic N-outcome markets with bookmaker margins around 0-8%."""
+    rng = np.random.default_rng(seed)
+    fair = rng.dirichlet(np.ones(outcomes), size=markets)
+    margins = rng.uniform(1.0, 1.08, size=(markets, providers, 1))
+    odds = np.round(1 / (fair[:, None, :] * margins), 2)
+    names = [f"Provider {p}" for p in range(providers)]
+    return [
+        {'outcomes': [f"Outcome {k}" for k in range(outcomes)], 'providers': names, 'odds': odds[m]}
+        for m in range(markets)
+    ]
+
+
+def bench_solver(args):
+    """Time the N-outcome solver on the market of a saved match page and on synthetic sweeps."""
+    with open(args.fixture, encoding='utf-8') as f:
+        market = parse_match_market(f.read())
+    recorded = [market] * args.markets
+    solve_time = min(timeit.repeat(lambda: solve_markets(recorded, profit=10), number=1, repeat=args.repeat))
+    result = solve_markets([market], profit=10)[0]
+    print(f"{args.fixture}: {len(market['outcomes'])}-way ({', '.join(market['outcomes'])}) x {len(market['providers'])} providers, "
+          + (f"arbitrage at implied sum {result['implied_sum']:.3f}" if result else "no arbitrage")
+          + f"; {args.markets} copies in {solve_time * 1000:.1f} ms")
+
+    for outcomes in args.outcomes:
+        markets = generate_markets(args.markets, args.providers, outcomes)
+        solve_time = min(timeit.repeat(lambda: solve_markets(markets, profit=10), number=1, repeat=args.repeat))
+        found = sum(result is not None for result in solve_markets(markets, profit=10))
+        print(f"{outcomes}-way: {args.markets} markets x {args.providers} providers in {solve_time * 1000:.1f} ms "
+              f"({solve_time / args.markets * 1e6:.1f} us/market, {found} arbitrages)")
+
+
+def greedy_allocation(opportunities, balances):
+    """Fund opportunities best arbitrage percentage first, each as far as the remaining balances allow."""
+    remaining = dict(balances)
+    profit = 0.0
+    for opportunity in sorted(filter(None, opportunities), key=lambda o: o['implied_sum']):
+        # Stake per unit of payout at each provider, summed if a provider takes several outcomes
+        per_payout = {}
+        for provider, odds in zip(opportunity['providers'], opportunity['odds']):
+            per_payout[provider] = per_payout.get(provider, 0.0) + 1 / odds
+        payout = min(remaining.get(provider, 0.0) / stake for provider, stake in per_payout.items())
+        for provider, stake in per_payout.items():
+            remaining[provider] -= payout * stake
+        profit += payout * (1 - opportunity['implied_sum'])
+    return profit
+
+
+def bench_portfolio(args):
+    """Time the portfolio LP on the arbitrages of a synthetic sweep against a greedy allocation."""
+    markets = generate_markets(args.markets, args.providers, args.outcomes)
+    opportunities = [o for o in solve_markets(markets) if o is not None]
+    rng = np.random.default_rng(1)
+    balances = {f"Provider {p}": float(rng.uniform(50, args.balance)) for p in range(args.providers)}
+
+    solve_time = min(timeit.repeat(lambda: allocate_portfolio(opportunities, balances, args.bankroll), number=1, repeat=args.repeat))
+    allocations = allocate_portfolio(opportunities, balances, args.bankroll)
+    funded = [a for a in allocations if a is not None]
+    lp_profit = sum(a['guaranteed_profit'] for a in funded)
+    staked = sum(a['total_investment'] for a in funded)
+    print(f"{len(opportunities)} opportunities, {args.providers} providers, balances up to ${args.balance:.0f}"
+          + (f", bankroll ${args.bankroll:.0f}" if args.bankroll is not None else ""))
+    print(f"  LP:     {solve_time * 1000:.1f} ms, {len(funded)} funded, ${staked:.2f} staked, ${lp_profit:.2f} guaranteed profit")
+    if args.bankroll is None:
+        print(f"  greedy: ${greedy_allocation(opportunities, balances):.2f} guaranteed profit")
+
+
+def bench_watchlist(args):
+    """
+    Time single-provider odds updates plus a top-k query: watchlist vs full rescan.
+
+    The rescan recomputes every match's best pair with the batched NumPy scan and
+    sorts the sums; the watchlist moves one provider price and one match per update.
+    """
+    markets = generate_markets(args.matches, args.providers, 2)
+    tables = [OddsTable(("Team A", "Team B"), market['providers'], market['odds']) for market in markets]
+    rng = np.random.default_rng(2)
+    # Each update moves one provider's prices by up to 3%
+    updates = [
+        (int(m), int(p), tuple(np.round(tables[m].odds[p] * rng.uniform(0.97, 1.03, size=2), 2)))
+        for m, p in zip(rng.integers(args.matches, size=args.updates), rng.integers(args.providers, size=args.updates))
+    ]
+
+    watchlist = NearArbitrageWatchlist()
+    start = time.perf_counter()
+    for m, table in enumerate(tables):
+        watchlist.update_table(m, table)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for m, p, odds in updates:
+        watchlist.update_odds(m, tables[m].providers[p], odds)
+        top = watchlist.top(args.top)
+    incremental = (time.perf_counter() - start) / len(updates)
+
+    odds_arrays = [table.odds.copy() for table in tables]
+    providers = [table.providers for table in tables]
+    rescans = updates[:args.rescans]
+    start = time.perf_counter()
+    for m, p, odds in rescans:
+        odds_arrays[m][p] = odds
+        _, _, sums = best_pairs(*pack_odds(list(zip(providers, odds_arrays))))
+        order = np.argsort(sums, kind='stable')[:args.top]
+    rescan = (time.perf_counter() - start) / len(rescans)
+
+    # Both sides have now applied the first rescans updates; compare on a fresh watchlist
+    check = NearArbitrageWatchlist()
+    for m in range(args.matches):
+        check.update_table(m, OddsTable(("Team A", "Team B"), providers[m], odds_arrays[m]))
+    identical = np.allclose([s for _, s in check.top(args.top)], sums[order])
+
+    print(f"{args.matches} matches x {args.providers} providers, top {args.top}")
+    print(f"  build:       {build * 1000:8.1f} ms")
+    print(f"  watchlist:   {incremental * 1e6:8.1f} us per update + top-k ({len(updates)} updates)")
+    print(f"  rescan:      {rescan * 1e6:8.1f} us per update + top-k ({len(rescans)} updates)")
+    print(f"  speedup:     {rescan / incremental:8.1f}x   identical {identical}")
+
+
+def measure(func, repeat):
+    """Return (best seconds per call, peak traced bytes of one call)."""
+    seconds = min(timeit.repeat(func, number=repeat, repeat=3)) / repeat
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def bench_replay(args):
+    """
+    Measure parse time, arbitrage scan time and memory for every page of a recording.
+
+    With --save the results are written as JSON; with --compare they are checked
+    against a saved run and the process exits with status 1 on a regression.
+    """
+    session = ReplaySession(args.directory)
+    results = {}
+    parsed_odds = []
+    for url in session.manifest:
+        page_html = session.page(url)
+        parse = parse_upcoming_matches if url == MATCHES_URL else parse_match_odds
+        seconds, peak = measure(lambda: parse(page_html), args.repeat)
+        results[f"parse {url}"] = {'seconds': seconds, 'peak_bytes': peak}
+        if parse is parse_match_odds:
+            odds_info = parse(page_html)
+            parsed_odds.append((odds_info['teams'], odds_info['odds']))
+
+    if parsed_odds:
+        seconds, peak = measure(lambda: check_arbitrage_batch(parsed_odds), args.repeat)
+        results["arbitrage scan"] = {'seconds': seconds, 'peak_bytes': peak}
+
+    for name, result in results.items():
+        print(f"{name}: {result['seconds'] * 1000:.3f} ms, peak {result['peak_bytes'] / 1024:.1f} KiB")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            for metric in ('seconds', 'peak_bytes'):
+                limit = baseline[name][metric] * (1 + args.tolerance)
+                if result[metric] > limit:
+                    regressions.append(f"{name} {metric}: {result[metric]:.6g} > {limit:.6g}")
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HLTV scraper benchmarks")
+    # Options accepted after any subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--log-level", default="WARNING", help="level of the diagnostics written to stderr")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    session_parser = subparsers.add_parser("session", parents=[common], help="driver-per-match vs shared session")
+    session_parser.add_argument("--matches", type=int, default=10, help="number of matches to scrape")
+    session_parser.add_argument("urls", nargs="*", help="match URLs (default: today's matches)")
+    session_parser.set_defaults(func=bench_session)
+
+    pool_parser = subparsers.add_parser("pool", parents=[common], help="serial session vs worker pool")
+    pool_parser.add_argument("--matches", type=int, default=20, help="number of matches to scrape")
+    pool_parser.add_argument("--workers", type=int, default=4, help="number of browser workers")
+    pool_parser.add_argument("urls", nargs="*", help="match URLs (default: today's matches)")
+    pool_parser.set_defaults(func=bench_pool)
+
+    shards_parser = subparsers.add_parser("shards", parents=[common], help="process-pool sweep throughput vs process count")
+    shards_parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4], help="process counts to test")
+    shards_parser.add_argument("--matches", type=int, default=200, help="number of matches to scrape")
+    shards_parser.add_argument("--backend", choices=["replay", "http", "selenium"], default="replay", help="odds page backend")
+    shards_parser.add_argument("--fixture", default="fixtures/test.html", help="match page served by the replay backend")
+    shards_parser.add_argument("urls", nargs="*", help="match URLs for selenium/http (default: today's matches)")
+    shards_parser.set_defaults(func=bench_shards)
+
+    startup_parser = subparsers.add_parser("startup", parents=[common], help="cold vs warm browser start to a loaded match list")
+    startup_parser.add_argument("--runs", type=int, default=3, help="starts per variant")
+    startup_parser.add_argument("--headless", action="store_true", help="run Chrome headless in the warm variants")
+    startup_parser.add_argument("--block-resources", action="store_true", help="block images and fonts in the warm variants")
+    startup_parser.set_defaults(func=bench_startup)
+
+    cache_parser = subparsers.add_parser("cache", parents=[common], help="HTTP page cache hit rate and bytes saved over several sweeps")
+    cache_parser.add_argument("--sweeps", type=int, default=3, help="number of sweeps")
+    cache_parser.add_argument("--matches", type=int, default=100, help="match pages per sweep")
+    cache_parser.add_argument("--changed", type=float, default=0.2, help="share of match pages changed between sweeps")
+    cache_parser.add_argument("--list-ttl", type=float, default=600, help="TTL of the match list")
+    cache_parser.add_argument("--match-ttl", type=float, default=0, help="TTL of match pages")
+    cache_parser.add_argument("--max-bytes", type=int, default=200 * 1024 * 1024, help="cache size cap")
+    cache_parser.add_argument("--fixture", default="fixtures/test.html", help="saved match page")
+    cache_parser.add_argument("--match-list", default="fixtures/matches.html", help="saved match list page")
+    cache_parser.set_defaults(func=bench_cache)
+
+    parse_parser = subparsers.add_parser("parse", parents=[common], help="lxml vs Selenium parsing of a saved match page")
+    parse_parser.add_argument("--fixture", default="fixtures/test.html", help="saved match page")
+    parse_parser.add_argument("--repeat", type=int, default=200, help="lxml iterations per timing run")
+    parse_parser.add_argument("--selenium-repeat", type=int, default=5, help="Selenium iterations")
+    parse_parser.add_argument("--skip-selenium", action="store_true", help="only time the lxml parser")
+    parse_parser.set_defaults(func=bench_parse)
+
+    calls_parser = subparsers.add_parser("calls", parents=[common], help="WebDriver calls per page, per-element vs single pass")
+    calls_parser.add_argument("--fixture", default="fixtures/test.html", help="saved match page")
+    calls_parser.add_argument("--match-list", action="store_true", help="also compare the live /matches page")
+    calls_parser.add_argument("--days", type=int, default=1, help="days of matches for --match-list")
+    calls_parser.add_argument("urls", nargs="*", help="extra match URLs")
+    calls_parser.set_defaults(func=bench_calls)
+
+    arbitrage_parser = subparsers.add_parser("arbitrage", parents=[common], help="nested provider loop vs batched NumPy scan")
+    arbitrage_parser.add_argument("--matches", type=int, default=1000, help="matches per sweep")
+    arbitrage_parser.add_argument("--providers", type=int, default=40, help="providers per match")
+    arbitrage_parser.add_argument("--repeat", type=int, default=5, help="timing repetitions for the batched scan")
+    arbitrage_parser.set_defaults(func=bench_arbitrage)
+
+    store_parser = subparsers.add_parser("store", parents=[common], help="odds store write throughput and range query latency")
+    store_parser.add_argument("--matches", type=int, default=50, help="matches polled")
+    store_parser.add_argument("--providers", type=int, default=20, help="providers per match")
+    store_parser.add_argument("--polls", type=int, default=200, help="polls per match")
+    store_parser.add_argument("--interval", type=float, default=60, help="seconds between polls")
+    store_parser.set_defaults(func=bench_store)
+
+    records_parser = subparsers.add_parser("records", parents=[common], help="odds dicts vs OddsTable memory and scan throughput")
+    records_parser.add_argument("--matches", type=int, default=50, help="matches polled")
+    records_parser.add_argument("--providers", type=int, default=20, help="providers per match")
+    records_parser.add_argument("--polls", type=int, default=288, help="polls per match (288 = every 5 minutes for a day)")
+    records_parser.add_argument("--repeat", type=int, default=3, help="timing repetitions")
+    records_parser.set_defaults(func=bench_records)
+
+    solver_parser = subparsers.add_parser("solver", parents=[common], help="N-outcome arbitrage solver throughput")
+    solver_parser.add_argument("--markets", type=int, default=500, help="markets per sweep")
+    solver_parser.add_argument("--providers", type=int, default=30, help="providers per market")
+    solver_parser.add_argument("--outcomes", type=int, nargs="+", default=[2, 3, 4], help="outcome counts to test")
+    solver_parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    solver_parser.add_argument("--fixture", default="fixtures/test.html", help="saved match page whose market is solved")
+    solver_parser.set_defaults(func=bench_solver)
+
+    portfolio_parser = subparsers.add_parser("portfolio", parents=[common], help="portfolio LP allocation time and profit vs greedy")
+    portfolio_parser.add_argument("--markets", type=int, default=2000, help="markets per sweep")
+    portfolio_parser.add_argument("--providers", type=int, default=30, help="providers per market")
+    portfolio_parser.add_argument("--outcomes", type=int, default=2, help="outcomes per market")
+    portfolio_parser.add_argument("--balance", type=float, default=1000, help="maximum balance per provider")
+    portfolio_parser.add_argument("--bankroll", type=float, default=None, help="cap on the total amount staked")
+    portfolio_parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    portfolio_parser.set_defaults(func=bench_portfolio)
+
+    watchlist_parser = subparsers.add_parser("watchlist", parents=[common], help="near-arbitrage index updates vs full rescan")
+    watchlist_parser.add_argument("--matches", type=int, default=2000, help="tracked matches")
+    watchlist_parser.add_argument("--providers", type=int, default=30, help="providers per match")
+    watchlist_parser.add_argument("--updates", type=int, default=20000, help="single-provider odds changes")
+    watchlist_parser.add_argument("--rescans", type=int, default=200, help="updates timed with a full rescan")
+    watchlist_parser.add_argument("--top", type=int, default=20, help="k of the top-k query")
+    watchlist_parser.set_defaults(func=bench_watchlist)
+
+    replay_parser = subparsers.add_parser("replay", parents=[common], help="per-page parse/arbitrage time and memory on a recording")
+    replay_parser.add_argument("directory", nargs="?", default="fixtures", help="recording directory")
+    replay_parser.add_argument("--repeat", type=int, default=100, help="calls per timing run")
+    replay_parser.add_argument("--save", help="write results as JSON")
+    replay_parser.add_argument("--compare", help="fail if slower or larger than this saved JSON")
+    replay_parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    replay_parser.set_defaults(func=bench_replay)
+
+    output_parser = subparsers.add_parser("output", parents=[common], help="report and logging overhead of text vs NDJSON output")
+    output_parser.add_argument("--matches", type=int, default=500, help="match pages in the sweep")
+    output_parser.add_argument("--repeat", type=int, default=7, help="runs per mode")
+    output_parser.add_argument("--fixture", default="fixtures/test.html", help="saved match page")
+    output_parser.add_argument("--pipe", action="store_true", help="write to a pipe instead of a file")
+    output_parser.set_defaults(func=bench_output)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
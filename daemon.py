@@ -0,0 +1,245 @@
+"""
+Long-running odds poller.
+
+Keeps the match list in memory and, on every poll cycle, only re-scrapes the
+matches that are about to start, whose odds moved recently, or that have not
+been looked at for a while, plus the matches whose best implied-probability
+sum is closest to an arbitrage. Arbitrage is only re-evaluated for matches
+whose provider odds changed since their previous poll.
+
+    python daemon.py --interval 60
+    python daemon.py --ndjson | my-alert-service   # one JSON record per changed match and arbitrage
+"""
+import argparse
+import logging
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+from main import (
+    browser_session,
+    check_arbitrage_10_win_batch,
+    count_arbitrage,
+    print_arbitrage,
+    print_timing_profile,
+    scrape_match_odds,
+    scrape_matches_for_days,
+)
+from metrics import record_sweep, start_metrics_server
+from odds_store import OddsStore
+from output import NDJSONWriter, arbitrage_record, configure_logging, match_record
+from records import odds_table
+from watchlist import NearArbitrageWatchlist
+
+logger = logging.getLogger(__name__)
+
+
+def match_start(match):
+    """Return the scheduled start of a match dict, or None if its time is not a clock time (e.g. LIVE)."""
+    try:
+        return datetime.strptime(f"{match['date']} {match['time']}", '%Y-%m-%d %H:%M')
+    except (KeyError, ValueError):
+        return None
+
+
+class OddsPoller:
+    """
+    Poll match odds incrementally in one browser session.
+
+    Args:
+        driver (WebDriver): Selenium WebDriver instance used for every page.
+        days (int): Days ahead of match list to track.
+        list_refresh (float): Seconds between match list refreshes.
+        start_window (float): Matches starting within this many seconds are polled every cycle.
+        moved_window (float): Matches whose odds changed within this many seconds are polled every cycle.
+        idle_interval (float): Every other match is polled at most this often.
+        single_pass (bool): Passed to the scrape functions.
+        odds_store (OddsStore, optional): Every scrape is appended to this store.
+        watch_top (int): The matches this many places closest to arbitrage are polled every cycle.
+        writer (NDJSONWriter, optional): Changed matches and arbitrages are written here instead of printed.
+    """
+
+    def __init__(self, driver, days=1, list_refresh=900, start_window=3600, moved_window=600,
+                 idle_interval=900, single_pass=True, odds_store=None, watch_top=20, writer=None):
+        self.driver = driver
+        self.odds_store = odds_store
+        self.writer = writer
+        self.days = days
+        self.list_refresh = list_refresh
+        self.start_window = start_window
+        self.moved_window = moved_window
+        self.idle_interval = idle_interval
+        self.single_pass = single_pass
+        self.watch_top = watch_top
+        self.watchlist = NearArbitrageWatchlist()
+
+        # link -> {'match', 'teams', 'snapshot', 'last_polled', 'last_changed', 'arbitrage'}
+        self.tracked = {}
+        self.list_refreshed_at = None
+        self.cycles = 0
+        self.last_cycle = None
+
+    def refresh_match_list(self, now):
+        """
+        Reload the match list, keeping poll state for matches that are still listed.
+
+        scrape_matches_for_days returns an empty list when the page fails to load,
+        so an empty list keeps the matches tracked so far and is retried next cycle.
+        """
+        matches = scrape_matches_for_days(
+            days=self.days, driver=self.driver, single_pass=self.single_pass,
+            handle_consent=self.list_refreshed_at is None
+        )
+        if not matches:
+            logger.warning("Match list refresh returned no matches; keeping %d tracked matches", len(self.tracked))
+            return
+        self.tracked = {
+            match['link']: self.tracked.get(match['link'], {
+                'match': match,
+                'teams': None,
+                'snapshot': None,
+                'last_polled': None,
+                'last_changed': None,
+                'arbitrage': None,
+            })
+            for match in matches
+        }
+        for link in [link for link in self.watchlist.matches if link not in self.tracked]:
+            self.watchlist.remove(link)
+        self.list_refreshed_at = now
+
+    def is_due(self, state, now):
+        """Decide whether a tracked match should be scraped in this cycle."""
+        if state['last_polled'] is None:
+            return True
+        start = match_start(state['match'])
+        if start is None or (start - now).total_seconds() <= self.start_window:
+            return True
+        if state['last_changed'] is not None and (now - state['last_changed']).total_seconds() <= self.moved_window:
+            return True
+        return (now - state['last_polled']).total_seconds() >= self.idle_interval
+
+    def poll_once(self):
+        """
+        Run one poll cycle.
+
+        Returns:
+            dict: Cycle statistics: latency, tracked, polled, skipped (not due),
+            unchanged (polled but odds identical), changed, arbitrages and
+            closest_sum (lowest implied-probability sum, None if nothing is ranked).
+        """
+        started = time.perf_counter()
+        now = datetime.now()
+        if self.list_refreshed_at is None or (now - self.list_refreshed_at).total_seconds() >= self.list_refresh:
+            self.refresh_match_list(now)
+
+        closest = {link for link, _ in self.watchlist.top(self.watch_top)}
+        due = [link for link, state in self.tracked.items() if link in closest or self.is_due(state, now)]
+        changed = []
+        for link in due:
+            state = self.tracked[link]
+            odds_info = scrape_match_odds(self.driver, link, handle_consent=False, single_pass=self.single_pass)
+            state['last_polled'] = datetime.now()
+            if not odds_info['teams'][0]:
+                continue
+            if self.odds_store is not None:
+                self.odds_store.append(link, odds_info)
+            # The OddsTable compares providers and float prices in one array comparison
+            snapshot = odds_table(odds_info)
+            if snapshot != state['snapshot']:
+                # The first observation is not a price move
+                if state['snapshot'] is not None:
+                    state['last_changed'] = state['last_polled']
+                state['teams'] = odds_info['teams']
+                state['snapshot'] = snapshot
+                self.watchlist.update_table(link, snapshot)
+                changed.append((link, odds_info, snapshot))
+
+        # Only matches whose provider odds moved need a new arbitrage check
+        arbitrages = 0
+        results = check_arbitrage_10_win_batch([snapshot for _, _, snapshot in changed])
+        for (link, odds_info, _), arbitrage in zip(changed, results):
+            match = self.tracked[link]['match']
+            self.tracked[link]['arbitrage'] = arbitrage
+            if self.writer is not None:
+                self.writer.write(match_record(match, odds_info))
+            if arbitrage:
+                arbitrages += 1
+                if self.writer is not None:
+                    odds_age = count_arbitrage(odds_info.get('scraped_at'))
+                    self.writer.write(arbitrage_record(match, odds_info, arbitrage, odds_age))
+                else:
+                    print(f"Match link: {link}")
+                    print_arbitrage(odds_info['teams'], arbitrage, scraped_at=odds_info.get('scraped_at'))
+        if self.writer is not None:
+            self.writer.flush()
+
+        self.cycles += 1
+        top = self.watchlist.top(1)
+        self.last_cycle = {
+            'cycle': self.cycles,
+            'latency': time.perf_counter() - started,
+            'tracked': len(self.tracked),
+            'polled': len(due),
+            'skipped': len(self.tracked) - len(due),
+            'unchanged': len(due) - len(changed),
+            'changed': len(changed),
+            'arbitrages': arbitrages,
+            'closest_sum': top[0][1] if top else None,
+        }
+        return self.last_cycle
+
+    def run(self, interval=60, max_cycles=None):
+        """Poll every interval seconds until max_cycles is reached (forever if None)."""
+        while max_cycles is None or self.cycles < max_cycles:
+            stats = self.poll_once()
+            record_sweep("daemon", stats['latency'], interval)
+            logger.info(
+                "Cycle %d: %.2fs, %d/%d polled, %d skipped, %d unchanged, %d changed, %d arbitrages%s",
+                stats['cycle'], stats['latency'], stats['polled'], stats['tracked'], stats['skipped'],
+                stats['unchanged'], stats['changed'], stats['arbitrages'],
+                f", closest implied sum {stats['closest_sum']:.4f}" if stats['closest_sum'] is not None else ""
+            )
+            if stats['latency'] > interval:
+                logger.warning("Poll cycle took longer than the %ss interval", interval)
+            time.sleep(max(0, interval - stats['latency']))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Continuously poll HLTV odds for arbitrage")
+    parser.add_argument("--days", type=int, default=1, help="days of upcoming matches to track")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between poll cycles")
+    parser.add_argument("--list-refresh", type=float, default=900, help="seconds between match list refreshes")
+    parser.add_argument("--start-window", type=float, default=3600, help="always poll matches starting within this many seconds")
+    parser.add_argument("--moved-window", type=float, default=600, help="always poll matches whose odds moved within this many seconds")
+    parser.add_argument("--idle-interval", type=float, default=900, help="poll every other match at most this often")
+    parser.add_argument("--watch-top", type=int, default=20, help="always poll this many matches closest to arbitrage")
+    parser.add_argument("--cycles", type=int, default=None, help="stop after this many cycles")
+    parser.add_argument("--store", default="odds_store", help="odds store directory ('' to disable)")
+    parser.add_argument("--metrics-port", type=int, default=9108, help="serve Prometheus metrics on this local port (0 to disable)")
+    parser.add_argument("--ndjson", action="store_true", help="write one JSON record per changed match and arbitrage to stdout")
+    parser.add_argument("--log-level", default="INFO", help="level of the diagnostics written to stderr")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+
+    with browser_session() as driver, OddsStore(args.store) if args.store else nullcontext() as odds_store, \
+            NDJSONWriter() if args.ndjson else nullcontext() as writer:
+        poller = OddsPoller(
+            driver,
+            days=args.days,
+            list_refresh=args.list_refresh,
+            start_window=args.start_window,
+            moved_window=args.moved_window,
+            idle_interval=args.idle_interval,
+            odds_store=odds_store,
+            watch_top=args.watch_top,
+            writer=writer,
+        )
+        try:
+            poller.run(interval=args.interval, max_cycles=args.cycles)
+        except KeyboardInterrupt:
+            logger.info("Stopping poller...")
+        print_timing_profile()
@@ -0,0 +1,242 @@
+"""
+Browserless backend: fetch raw HLTV pages over HTTP and parse them with lxml.
+
+The selectors mirror the ones used by the Selenium scraper in main.py so both
+backends produce the same 'match_data' and 'odds_data' shapes.
+"""
+import logging
+from datetime import datetime
+from urllib.parse import urljoin
+
+import numpy as np
+import requests
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+from metrics import INVALID_ODDS
+from records import OddsTable
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'https://www.hltv.org'
+MATCHES_URL = f'{BASE_URL}/matches'
+
+HEADERS = {
+    'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    'Accept': "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    'Accept-Language': "en-US,en;q=0.9",
+}
+
+# Selectors are compiled once at import time
+BETTING_SECTION = CSSSelector('.betting-section')
+TEAM_CELLS = CSSSelector('tr:first-child td.team-cell')
+PROVIDER_ROWS = CSSSelector('tr.provider')
+ODDS_CELLS = CSSSelector('td.odds-cell.border-left')
+PROVIDER_LINK = CSSSelector('a.betting-logo-link')
+LINK = CSSSelector('a')
+
+UPCOMING_MATCHES = CSSSelector('.upcomingMatch')
+MATCH_LINK = CSSSelector('a.match')
+MATCH_TIME = CSSSelector('.matchTime')
+MATCH_TEAMS = CSSSelector('.matchTeam')
+MATCH_TEAM_NAME = CSSSelector('.matchTeamName')
+MATCH_TEAM_LOGO = CSSSelector('.matchTeamLogo')
+MATCH_META = CSSSelector('.matchMeta')
+MATCH_EVENT_LOGO = CSSSelector('.matchEventLogo')
+MATCH_EVENT_NAME = CSSSelector('.matchEventName')
+
+
+def create_http_session():
+    """Create a requests session with browser-like headers"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    return session
+
+
+def fetch_page(session, url, timeout=15):
+    """
+    Fetch a page and return its HTML.
+
+    Raises:
+        requests.HTTPError: If the server does not answer with a 2xx status.
+    """
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def _text(element):
+    return element.text_content().strip()
+
+
+def _absolute(url, base_url):
+    return urljoin(base_url, url) if url is not None else None
+
+
+def parse_match_odds(page_html):
+    """
+    Parse the betting table of a match page.
+
+    Args:
+        page_html (str): Raw HTML of a match page (or just its betting section).
+
+    Returns:
+        dict: Contains 'teams' (list of team names), 'odds' (list of provider odds)
+        and 'table' (the same odds as an OddsTable), the same shape as main.scrape_match_odds.
+    """
+    odds_data = []
+    team_1_name = ""
+    team_2_name = ""
+
+    tree = lxml_html.fromstring(page_html)
+    sections = BETTING_SECTION(tree)
+    if not sections:
+        return {'teams': [team_1_name, team_2_name], 'odds': odds_data, 'table': OddsTable.from_odds_data([team_1_name, team_2_name], odds_data)}
+    betting_section = sections[0]
+
+    team_cells = TEAM_CELLS(betting_section)
+    if team_cells:
+        team_1_name = _text(team_cells[0])
+        team_2_name = _text(team_cells[-1])
+
+    for provider in PROVIDER_ROWS(betting_section):
+        # Skip rows with the "noOdds" class
+        if "noOdds" in provider.get('class', ''):
+            continue
+
+        odds_cells = ODDS_CELLS(provider)
+        provider_links = PROVIDER_LINK(provider)
+        if not odds_cells or not provider_links:
+            continue
+        provider_name = provider_links[0].get('aria-label')
+
+        team_1_links = LINK(odds_cells[0])
+        team_2_links = LINK(odds_cells[-1])
+        team_1_odds = _text(team_1_links[0]) if team_1_links else "-"
+        team_2_odds = _text(team_2_links[0]) if team_2_links else "-"
+
+        # Ensure odds are valid (numbers, not "-")
+        if not team_1_odds.replace('.', '', 1).isdigit() or not team_2_odds.replace('.', '', 1).isdigit():
+            logger.debug("Invalid odds detected for provider: %s", provider_name)
+            INVALID_ODDS.inc()
+            continue
+
+        odds_data.append({
+            "provider": provider_name,
+            team_1_name: team_1_odds,
+            team_2_name: team_2_odds,
+        })
+
+    return {
+        'teams': [team_1_name, team_2_name],
+        'odds': odds_data,
+        'table': OddsTable.from_odds_data([team_1_name, team_2_name], odds_data)
+    }
+
+
+def parse_match_market(page_html):
+    """
+    Parse every outcome column of the betting table of a match page.
+
+    Unlike parse_match_odds this keeps middle columns (e.g. a draw), so the
+    result can be passed to arbitrage.solve_markets. Columns in which no provider
+    offers a price are dropped.
+
+    Returns:
+        dict: 'outcomes' (names), 'providers' (names) and 'odds' (providers x
+        outcomes array, NaN where a provider has no price).
+    """
+    market = {'outcomes': [], 'providers': [], 'odds': np.empty((0, 0))}
+    sections = BETTING_SECTION(lxml_html.fromstring(page_html))
+    if not sections:
+        return market
+    betting_section = sections[0]
+
+    outcomes = [_text(cell) or "Draw" for cell in TEAM_CELLS(betting_section)]
+    rows = []
+    for provider in PROVIDER_ROWS(betting_section):
+        odds_cells = ODDS_CELLS(provider)
+        provider_links = PROVIDER_LINK(provider)
+        if "noOdds" in provider.get('class', '') or len(odds_cells) != len(outcomes) or not provider_links:
+            continue
+        row = []
+        for cell in odds_cells:
+            links = LINK(cell)
+            text = _text(links[0]).replace(',', '.') if links else "-"
+            row.append(float(text) if text.replace('.', '', 1).isdigit() else np.nan)
+        market['providers'].append(provider_links[0].get('aria-label'))
+        rows.append(row)
+
+    odds = np.array(rows, dtype=np.float64).reshape(len(rows), len(outcomes))
+    priced = ~np.isnan(odds).all(axis=0) if len(rows) else np.zeros(len(outcomes), dtype=bool)
+    market['outcomes'] = [name for name, keep in zip(outcomes, priced) if keep]
+    market['odds'] = odds[:, priced]
+    return market
+
+
+def parse_upcoming_matches(page_html, start=None, end=None, base_url=BASE_URL):
+    """
+    Parse the upcoming match list of the /matches page.
+
+    Args:
+        page_html (str): Raw HTML of the /matches page.
+        start (datetime, optional): Skip matches starting before this time.
+        end (datetime, optional): Skip matches starting after this time.
+        base_url (str): Used to make match, logo and event links absolute.
+
+    Returns:
+        list: Match dicts in page order, the same shape as main.scrape_matches_for_days.
+    """
+    matches = []
+    tree = lxml_html.fromstring(page_html)
+
+    for match in UPCOMING_MATCHES(tree):
+        try:
+            # Filter on the start time before reading any other field
+            unix_time = int(match.get('data-zonedgrouping-entry-unix'))
+            match_datetime = datetime.fromtimestamp(unix_time / 1000)
+
+            if start is not None and match_datetime < start:
+                continue
+            if end is not None and match_datetime > end:
+                continue
+
+            match_link = _absolute(MATCH_LINK(match)[0].get('href'), base_url)
+            match_time = _text(MATCH_TIME(match)[0])
+
+            teams = []
+            for team_element in MATCH_TEAMS(match):
+                logos = MATCH_TEAM_LOGO(team_element)
+                teams.append({
+                    "name": _text(MATCH_TEAM_NAME(team_element)[0]),
+                    "logo": _absolute(logos[0].get('src'), base_url) if logos else None
+                })
+
+            meta = MATCH_META(match)
+            match_format = _text(meta[0]) if meta else "Unknown"
+
+            event_logos = MATCH_EVENT_LOGO(match)
+            event_names = MATCH_EVENT_NAME(match)
+            if event_logos and event_names:
+                event_logo = _absolute(event_logos[0].get('src'), base_url)
+                event_name = _text(event_names[0])
+            else:
+                event_logo, event_name = None, None
+
+            matches.append({
+                'date': match_datetime.strftime('%Y-%m-%d'),
+                'time': match_time,
+                'teams': teams,
+                'format': match_format,
+                'event': {
+                    'name': event_name,
+                    'logo': event_logo
+                },
+                'link': match_link
+            })
+
+        except Exception as e:
+            logger.warning("Error processing match: %s", e)
+            continue
+
+    return matches
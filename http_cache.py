@@ -0,0 +1,202 @@
+"""
+On-disk HTTP page cache.
+
+CachedSession sits in front of a requests session (or anything with the same
+get interface) and keeps page bodies on disk with a SQLite index. A cached
+page younger than its TTL is served without a request; an older one is
+revalidated with If-None-Match / If-Modified-Since, so an unchanged page costs
+a 304 instead of a full download. The /matches list and match pages have
+separate TTLs, and the least recently used pages are evicted once the cache
+exceeds its size cap.
+
+    session = CachedSession(create_http_session(), "http_cache")
+    odds_info = parse_match_odds(fetch_page(session, match_url))
+    session.report()
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from http_backend import MATCHES_URL
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    encoding TEXT,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+"""
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response, built from a cached body"""
+
+    def __init__(self, url, content, encoding, status_code=200):
+        self.url = url
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.status_code = status_code
+        self.headers = {}
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def raise_for_status(self):
+        pass
+
+
+class CachedSession:
+    """
+    Cache pages fetched through a requests-like session.
+
+    Args:
+        session: Object with get(url, timeout=..., headers=...), e.g. from create_http_session.
+        directory (str): Directory holding the page bodies and index.sqlite.
+        list_ttl (float): Seconds the /matches list is served without revalidation.
+        match_ttl (float): Same for match pages. Odds move quickly, so by default
+            every match page is revalidated and only an unchanged page is saved.
+        max_bytes (int): Size cap of the stored bodies; least recently used pages
+            are evicted beyond it.
+    """
+
+    def __init__(self, session, directory, list_ttl=600, match_ttl=0, max_bytes=200 * 1024 * 1024):
+        self.session = session
+        self.directory = directory
+        self.list_ttl = list_ttl
+        self.match_ttl = match_ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Fetch workers call get from several threads
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Start counting a new sweep."""
+        self.stats = {'requests': 0, 'hits': 0, 'revalidated': 0, 'misses': 0, 'bytes_fetched': 0, 'bytes_saved': 0}
+
+    def ttl(self, url):
+        """Return the TTL for a URL: list_ttl for the /matches list, match_ttl otherwise."""
+        if urlparse(url).path.rstrip('/') == urlparse(MATCHES_URL).path:
+            return self.list_ttl
+        return self.match_ttl
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _read(self, url, filename, encoding):
+        with open(self._path(filename), 'rb') as f:
+            return CachedResponse(url, f.read(), encoding)
+
+    def _store(self, url, response, now):
+        content = response.content
+        filename = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+        with open(self._path(filename), 'wb') as f:
+            f.write(content)
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages (url, filename, etag, last_modified, encoding, size, fetched_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, filename, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+             response.encoding, len(content), now, now)
+        )
+        self._evict()
+        self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, filename, size in self.db.execute("SELECT url, filename, size FROM pages ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(filename))
+            except OSError:
+                pass
+            self.db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+
+    def get(self, url, timeout=None, headers=None):
+        """
+        Return a cached, revalidated or freshly fetched response for url.
+
+        Raises:
+            requests.RequestException: If the upstream request fails.
+        """
+        now = time.time()
+        with self._lock:
+            self.stats['requests'] += 1
+            row = self.db.execute(
+                "SELECT filename, etag, last_modified, encoding, size, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+            if row is not None and now - row[5] < self.ttl(url) and os.path.exists(self._path(row[0])):
+                self.db.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, url))
+                self.db.commit()
+                self.stats['hits'] += 1
+                self.stats['bytes_saved'] += row[4]
+                return self._read(url, row[0], row[3])
+
+        conditional = dict(headers or {})
+        if row is not None and os.path.exists(self._path(row[0])):
+            if row[1]:
+                conditional['If-None-Match'] = row[1]
+            if row[2]:
+                conditional['If-Modified-Since'] = row[2]
+        response = self.session.get(url, timeout=timeout, headers=conditional)
+
+        with self._lock:
+            if response.status_code == 304 and row is not None:
+                self.db.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+                self.db.commit()
+                self.stats['revalidated'] += 1
+                self.stats['bytes_saved'] += row[4]
+                return self._read(url, row[0], row[3])
+
+            if response.status_code == 200:
+                self._store(url, response, now)
+            self.stats['misses'] += 1
+            self.stats['bytes_fetched'] += len(response.content)
+        return response
+
+    def summary(self, label="sweep"):
+        """Return the hit rate and bytes saved since the last reset_stats as one line."""
+        stats = self.stats
+        served = stats['hits'] + stats['revalidated']
+        hit_rate = served / stats['requests'] if stats['requests'] else 0.0
+        total = stats['bytes_fetched'] + stats['bytes_saved']
+        saved_share = stats['bytes_saved'] / total if total else 0.0
+        return (
+            f"HTTP cache for {label}: {stats['requests']} requests, {stats['hits']} fresh hits, "
+            f"{stats['revalidated']} revalidated, {stats['misses']} fetched; hit rate {hit_rate:.0%}, "
+            f"{stats['bytes_saved'] / 1024:.1f} KiB saved ({saved_share:.0%}), {stats['bytes_fetched'] / 1024:.1f} KiB downloaded"
+        )
+
+    def report(self, label="sweep"):
+        """Log the summary of the current sweep."""
+        logger.info(self.summary(label))
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -4,12 +4,97 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
 import time
+from collections import Counter
+from itertools import chain, groupby
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
 
-def setup_driver():
-    """Setup Chrome driver with appropriate options"""
+from arbitrage import allocate_portfolio, fixed_profit_result, market_from_odds_info, scan_arbitrage, solve_markets, total_investment_result
+from metrics import (
+    ARBITRAGE_CHECK_SECONDS,
+    ARBITRAGES_REPORTED,
+    COOKIE_CHECKS,
+    COOKIE_POPUPS,
+    DRIVER_SETUP_SECONDS,
+    INVALID_ODDS,
+    ODDS_AGE_SECONDS,
+    SCRAPE_ODDS_SECONDS,
+    record_sweep,
+    start_metrics_server,
+)
+from http_backend import BASE_URL, MATCHES_URL, create_http_session, fetch_page, parse_match_odds, parse_upcoming_matches
+from http_cache import CachedSession
+from odds_store import OddsStore
+from output import NDJSONWriter, arbitrage_record, configure_logging, match_record
+from records import OddsTable, odds_table
+
+logger = logging.getLogger(__name__)
+
+# Resolved chromedriver path, shared by every run started from this directory
+DRIVER_PATH_CACHE = ".chromedriver.json"
+# Re-resolve once a day so a Chrome update is picked up
+DRIVER_PATH_MAX_AGE = 24 * 3600
+
+# Images and fonts are never needed: logos are read from their src attribute
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+]
+
+# Written into a Chrome profile directory once the cookie consent has been accepted in it
+CONSENT_MARKER = "consent_accepted"
+
+def chromedriver_path(refresh=False, max_age=DRIVER_PATH_MAX_AGE):
+    """
+    Return the chromedriver path, resolving it with ChromeDriverManager at most once per max_age.
+
+    Args:
+        refresh (bool): Ignore the cached path and resolve it again.
+        max_age (float): Seconds a cached path is trusted.
+    """
+    if not refresh:
+        try:
+            with open(DRIVER_PATH_CACHE, encoding='utf-8') as f:
+                cached = json.load(f)
+            if time.time() - cached['resolved_at'] < max_age and os.path.exists(cached['path']):
+                return cached['path']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    path = ChromeDriverManager().install()
+    # Write then rename, so concurrent processes never read a partial file
+    temp_path = f"{DRIVER_PATH_CACHE}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'path': path, 'resolved_at': time.time()}, f)
+    os.replace(temp_path, DRIVER_PATH_CACHE)
+    return path
+
+def profile_has_consent(profile_dir):
+    """Return True if the cookie consent has been accepted in this Chrome profile directory"""
+    return profile_dir is not None and os.path.exists(os.path.join(profile_dir, CONSENT_MARKER))
+
+@DRIVER_SETUP_SECONDS.time()
+def setup_driver(headless=False, block_resources=False, profile_dir=None):
+    """
+    Setup Chrome driver with appropriate options
+
+    Args:
+        headless (bool): Run Chrome without a window.
+        block_resources (bool): Do not download images and fonts.
+        profile_dir (str, optional): Chrome profile directory to reuse, so cookies
+            (including the consent) survive restarts. Chrome allows one running
+            driver per directory.
+    """
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_argument('--disable-infobars')
@@ -20,47 +105,342 @@ def setup_driver():
     chrome_options.add_argument(f"user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    if headless:
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--window-size=1920,1080')
+    if block_resources:
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    if profile_dir is not None:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    try:
+        driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
+    except SessionNotCreatedException:
+        # A Chrome update can leave the cached driver behind
+        driver = webdriver.Chrome(service=Service(chromedriver_path(refresh=True)), options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    if block_resources:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_RESOURCE_PATTERNS})
     
     return driver
 
-def handle_cookie_consent(driver):
-    """Handle the cookie consent popup"""
+@contextmanager
+def browser_session(**driver_options):
+    """
+    Start a single Chrome driver and guarantee it is closed afterwards.
+
+    Args:
+        **driver_options: Passed to setup_driver (headless, block_resources, profile_dir).
+
+    Yields:
+        WebDriver: Selenium WebDriver instance shared by every page load in the session.
+    """
+    logger.info("Setting up Chrome driver...")
+    driver = setup_driver(**driver_options)
     try:
-        print("Looking for cookie consent button...")
-        wait = WebDriverWait(driver, 10)
-        
-        cookie_button_selectors = [
-            "button#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll",
-            ".fc-button-label",
-            "button[data-accept-cookies='true']",
-            "#acceptAllButton",
-            ".accept-cookies-button"
-        ]
-        
-        for selector in cookie_button_selectors:
-            try:
-                cookie_button = wait.until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                )
-                print(f"Found cookie consent button with selector: {selector}")
-                cookie_button.click()
-                print("Successfully accepted cookies")
-                time.sleep(1)
-                return True
-            except Exception:
-                continue
-                
-        print("Cookie consent button not found with known selectors")
-        return False
+        yield driver
+    finally:
+        logger.info("Closing browser...")
+        driver.quit()
+
+class WebDriverCallCounter:
+    """
+    Count the WebDriver commands issued through a driver.
+
+    Every find_element, get_attribute, .text or execute_script call is one
+    command, i.e. one round trip to chromedriver. Calls made through WebElements
+    are counted too since they go through the parent driver.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.counts = Counter()
+        self._original_execute = None
+
+    def start(self):
+        self._original_execute = self.driver.execute
+
+        def counting_execute(driver_command, params=None):
+            self.counts[driver_command] += 1
+            return self._original_execute(driver_command, params)
+
+        self.driver.execute = counting_execute
+        return self
+
+    def stop(self):
+        if self._original_execute is not None:
+            self.driver.execute = self._original_execute
+            self._original_execute = None
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class PageTimer:
+    """
+    Split the time spent on one page into phases (navigate, consent, wait, extract).
+
+    Call lap(phase) at the end of each phase; report() prints the breakdown and
+    adds it to the process-wide totals shown by print_timing_profile.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def skip(self):
+        """Leave the time since the last lap out of every phase (e.g. time spent by a consumer)"""
+        self._last = time.perf_counter()
+
+    def report(self, label):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Timing for %s: %s", label, ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.phases.items()))
+        with _timing_lock:
+            for phase, seconds in self.phases.items():
+                timing_totals[phase] += seconds
+                timing_counts[phase] += 1
+
+timing_totals = Counter()
+timing_counts = Counter()
+_timing_lock = threading.Lock()
+
+def print_timing_profile():
+    """Log total and mean time per page phase across every page scraped so far"""
+    if not timing_totals:
+        return
+    logger.info("Timing profile:")
+    for phase, total in timing_totals.items():
+        logger.info("  %-10s total %8.2fs  mean %6.2fs over %d pages", phase, total, total / timing_counts[phase], timing_counts[phase])
+
+COOKIE_BUTTON_SELECTORS = [
+    "button#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll",
+    ".fc-button-label",
+    "button[data-accept-cookies='true']",
+    "#acceptAllButton",
+    ".accept-cookies-button"
+]
+
+def find_clickable(driver, selectors):
+    """Return the first displayed and enabled element matching any of the selectors, or False"""
+    for element in driver.find_elements(By.CSS_SELECTOR, ", ".join(selectors)):
+        try:
+            if element.is_displayed() and element.is_enabled():
+                return element
+        except Exception:
+            continue
+    return False
+
+def handle_cookie_consent(driver, timeout=10):
+    """
+    Handle the cookie consent popup.
+
+    All known button selectors are probed together on every poll, so the wait
+    ends as soon as any of them is clickable and never exceeds timeout seconds.
+    """
+    try:
+        logger.debug("Looking for cookie consent button...")
+        COOKIE_CHECKS.inc()
+        try:
+            cookie_button = WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+                lambda d: find_clickable(d, COOKIE_BUTTON_SELECTORS)
+            )
+        except Exception:
+            logger.info("Cookie consent button not found with known selectors")
+            return False
+
+        logger.debug("Found cookie consent button: %s.%s", cookie_button.tag_name, cookie_button.get_attribute('class'))
+        cookie_button.click()
+        COOKIE_POPUPS.inc()
+        logger.info("Successfully accepted cookies")
+        try:
+            WebDriverWait(driver, 2, poll_frequency=0.1).until(EC.invisibility_of_element(cookie_button))
+        except Exception:
+            pass
+        return True
         
     except Exception as e:
-        print(f"Error handling cookie consent: {e}")
+        logger.error("Error handling cookie consent: %s", e)
         return False
 
+def warm_up_driver(driver, profile_dir=None):
+    """
+    Load HLTV once so the connection and HTTP cache are warm.
+
+    The cookie consent is accepted unless the profile already has it; once it is
+    accepted in a profile directory the directory is marked, so later drivers
+    using it can skip the consent popup.
+    """
+    driver.get(BASE_URL)
+    if not profile_has_consent(profile_dir) and handle_cookie_consent(driver) and profile_dir is not None:
+        open(os.path.join(profile_dir, CONSENT_MARKER), 'w').close()
+
+class DriverPool:
+    """
+    Keep Chrome drivers started and warmed up before they are needed.
+
+    Drivers are started in background threads. Each gets its own profile
+    directory under profile_root (Chrome locks a profile to one running
+    instance), so the cookie consent survives restarts and pooled drivers can
+    skip the consent popup.
+
+    Args:
+        size (int): Number of drivers to keep.
+        profile_root (str): Directory holding one profile directory per driver.
+        headless (bool): Passed to setup_driver.
+        block_resources (bool): Passed to setup_driver.
+    """
+
+    def __init__(self, size=2, profile_root="chrome_profiles", headless=False, block_resources=False):
+        self.size = size
+        self.headless = headless
+        self.block_resources = block_resources
+        self._idle = queue.Queue()
+        self._free_profiles = queue.Queue()
+        for index in range(size):
+            profile_dir = os.path.join(profile_root, f"driver-{index}")
+            os.makedirs(profile_dir, exist_ok=True)
+            self._free_profiles.put(profile_dir)
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Start warming up every driver in the background and return immediately."""
+        for _ in range(self.size):
+            self._spawn()
+        return self
+
+    def _spawn(self):
+        threading.Thread(target=self._start_driver, daemon=True).start()
+
+    def _start_driver(self):
+        profile_dir = self._free_profiles.get()
+        try:
+            driver = setup_driver(headless=self.headless, block_resources=self.block_resources, profile_dir=profile_dir)
+        except Exception as e:
+            logger.error("Could not start pooled driver: %s", e)
+            self._free_profiles.put(profile_dir)
+            return
+        try:
+            warm_up_driver(driver, profile_dir)
+        except Exception as e:
+            logger.warning("Pooled driver warm-up failed: %s", e)
+        with self._lock:
+            self._profiles[driver] = profile_dir
+            closed = self._closed
+        if closed:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            profile_dir = self._profiles.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if profile_dir is not None:
+            self._free_profiles.put(profile_dir)
+
+    def acquire(self, timeout=120):
+        """
+        Take a warmed-up driver, waiting for one if all are busy or still starting.
+
+        Raises:
+            queue.Empty: If no driver becomes available within timeout seconds.
+        """
+        return self._idle.get(timeout=timeout)
+
+    def release(self, driver, broken=False):
+        """Return a driver to the pool. A broken driver is quit and replaced by a fresh one."""
+        if broken or self._closed:
+            self._discard(driver)
+            if not self._closed:
+                self._spawn()
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout=120):
+        """Borrow a driver for a with block; it is replaced if the block raises."""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, broken=True)
+            raise
+        self.release(driver)
+
+    def close(self):
+        """Quit every driver, including ones still warming up once they are ready."""
+        with self._lock:
+            self._closed = True
+            drivers = list(self._profiles)
+        for driver in drivers:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+def wait_for_match_list(driver, timeout=20, settle=0.5):
+    """
+    Wait until the upcoming match list has finished rendering.
+
+    Returns as soon as the number of upcomingMatch elements has stayed the same
+    for settle seconds, instead of sleeping a fixed amount. A count that stays
+    at 0 means there are no upcoming matches.
+
+    Raises:
+        TimeoutException: If the list wrapper does not appear or keeps changing for timeout seconds.
+    """
+    deadline = time.perf_counter() + timeout
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CLASS_NAME, "upcomingMatchesWrapper")))
+
+    state = {'count': -1, 'since': time.perf_counter()}
+
+    def count_is_stable(d):
+        count = d.execute_script("return document.getElementsByClassName('upcomingMatch').length")
+        now = time.perf_counter()
+        if count != state['count']:
+            state['count'] = count
+            state['since'] = now
+            return False
+        return now - state['since'] >= settle
+
+    WebDriverWait(driver, max(0.0, deadline - time.perf_counter()), poll_frequency=0.1).until(count_is_stable)
+    return state['count']
+
+def wait_for_betting_rows(driver, timeout=10):
+    """
+    Wait until the betting section is present.
+
+    Only the section is waited for, not its rows: the provider rows are part of
+    the served HTML (the http backend parses them from it), and with the default
+    page load strategy driver.get returns once the document is complete.
+
+    Raises:
+        TimeoutException: If the betting section does not appear within timeout seconds.
+    """
+    WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+        EC.presence_of_element_located((By.CLASS_NAME, "betting-section"))
+    )
+
 def get_match_format(match_element):
     """Extract match format (bo3, bo5, etc)"""
     try:
@@ -86,202 +466,382 @@ def get_event_info(match_element):
     except:
         return None, None
 
-def scrape_upcoming_matches():
-    print("Setting up Chrome driver...")
-    driver = setup_driver()
-    matches_by_week = {}
-    
-    try:
-        print("Attempting to access HLTV.org...")
-        driver.get('https://www.hltv.org/matches')
-        
-        handle_cookie_consent(driver)
-        
-        print("Waiting for page to load...")
-        wait = WebDriverWait(driver, 20)
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "upcomingMatchesWrapper")))
-        time.sleep(3)
-        
-        print("Page loaded successfully. Extracting matches...")
-        match_elements = driver.find_elements(By.CLASS_NAME, "upcomingMatch")
-        
-        for match in match_elements:
-            try:
-                # Get match link
-                match_link = match.find_element(By.CSS_SELECTOR, "a.match").get_attribute("href")
-                
-                # Get match time
-                time_element = match.find_element(By.CLASS_NAME, "matchTime")
-                match_time = time_element.text.strip()
-                unix_time = int(match.get_attribute("data-zonedgrouping-entry-unix"))
-                match_datetime = datetime.fromtimestamp(unix_time/1000)
-                
-                # Get week number for grouping
-                week_number = match_datetime.isocalendar()[1]
-                week_key = f"Week {week_number} ({match_datetime.strftime('%B %Y')})"
-                
-                # Get teams
-                team_elements = match.find_elements(By.CLASS_NAME, "matchTeam")
-                teams = []
-                for team_element in team_elements:
-                    team_name = team_element.find_element(By.CLASS_NAME, "matchTeamName").text.strip()
-                    team_logo = get_team_logo(team_element)
-                    teams.append({
-                        "name": team_name,
-                        "logo": team_logo
-                    })
-                
-                # Get match format
-                match_format = get_match_format(match)
-                
-                # Get event information
-                event_logo, event_name = get_event_info(match)
-                
-                # Create match data structure
-                match_data = {
-                    'date': match_datetime.strftime('%Y-%m-%d'),
-                    'time': match_time,
-                    'teams': teams,
-                    'format': match_format,
-                    'event': {
-                        'name': event_name,
-                        'logo': event_logo
-                    },
-                    'link': match_link
-                }
-                
-                # Add to matches by week
-                if week_key not in matches_by_week:
-                    matches_by_week[week_key] = []
-                matches_by_week[week_key].append(match_data)
-                
-                print(f"Found match: {teams[0]['name']} vs {teams[1]['name']} ({match_time})")
-                
-            except Exception as e:
-                print(f"Error processing match: {e}")
+def in_date_range(match_datetime, start=None, end=None):
+    """Return True if match_datetime is within [start, end]; a missing bound is open"""
+    return (start is None or match_datetime >= start) and (end is None or match_datetime <= end)
+
+def week_key(match_datetime):
+    """Label used to group matches by ISO week, e.g. 'Week 23 (June 2025)'"""
+    return f"Week {match_datetime.isocalendar()[1]} ({match_datetime.strftime('%B %Y')})"
+
+# Extracts the whole upcoming match list in one WebDriver round trip. Matches
+# outside [arguments[0], arguments[1]] (unix ms, null = open) are skipped on
+# their start time before any other field is read.
+EXTRACT_MATCHES_SCRIPT = """
+var start = arguments[0], end = arguments[1];
+var text = function (element) { return element.innerText.trim(); };
+return Array.from(document.getElementsByClassName('upcomingMatch')).map(function (match) {
+    var unix = Number(match.getAttribute('data-zonedgrouping-entry-unix'));
+    if ((start !== null && unix < start) || (end !== null && unix > end)) { return null; }
+    try {
+        var meta = match.querySelector('.matchMeta');
+        var eventLogo = match.querySelector('.matchEventLogo');
+        var eventName = match.querySelector('.matchEventName');
+        return {
+            link: match.querySelector('a.match').href,
+            time: text(match.querySelector('.matchTime')),
+            unix: match.getAttribute('data-zonedgrouping-entry-unix'),
+            teams: Array.from(match.getElementsByClassName('matchTeam')).map(function (team) {
+                var logo = team.querySelector('.matchTeamLogo');
+                return {name: text(team.querySelector('.matchTeamName')), logo: logo ? logo.src : null};
+            }),
+            format: meta ? text(meta) : 'Unknown',
+            event: eventLogo && eventName
+                ? {name: text(eventName), logo: eventLogo.src}
+                : {name: null, logo: null}
+        };
+    } catch (e) {
+        return {error: String(e)};
+    }
+});
+"""
+
+# Extracts team names and every provider row of the betting table in one WebDriver round trip
+EXTRACT_ODDS_SCRIPT = """
+var section = document.querySelector('.betting-section');
+if (!section) { return null; }
+var text = function (element) { return element.innerText.trim(); };
+return {
+    teams: Array.from(section.querySelectorAll('tr:first-child td.team-cell')).map(text),
+    rows: Array.from(section.querySelectorAll('tr.provider')).map(function (row) {
+        var logo = row.querySelector('a.betting-logo-link');
+        return {
+            className: row.className,
+            provider: logo ? logo.getAttribute('aria-label') : null,
+            odds: Array.from(row.querySelectorAll('td.odds-cell.border-left')).map(function (cell) {
+                var link = cell.querySelector('a');
+                return link ? text(link) : null;
+            })
+        };
+    })
+};
+"""
+
+def extract_matches_script(driver, start=None, end=None):
+    """
+    Extract every upcoming match on the loaded /matches page with one execute_script call.
+
+    Args:
+        driver (WebDriver): Driver with the /matches page loaded.
+        start (datetime, optional): Skip matches starting before this time.
+        end (datetime, optional): Skip matches starting after this time.
+
+    Returns:
+        list: (match_datetime, match_data) tuples in page order.
+    """
+    matches = []
+    bounds = [bound.timestamp() * 1000 if bound is not None else None for bound in (start, end)]
+    for raw in driver.execute_script(EXTRACT_MATCHES_SCRIPT, *bounds):
+        if raw is None:
+            continue
+        try:
+            if 'error' in raw:
+                raise ValueError(raw['error'])
+            match_datetime = datetime.fromtimestamp(int(raw['unix']) / 1000)
+            if not in_date_range(match_datetime, start, end):
                 continue
-                
+            matches.append((match_datetime, {
+                'date': match_datetime.strftime('%Y-%m-%d'),
+                'time': raw['time'],
+                'teams': raw['teams'],
+                'format': raw['format'],
+                'event': raw['event'],
+                'link': raw['link']
+            }))
+        except Exception as e:
+            logger.warning("Error processing match: %s", e)
+            continue
+    return matches
+
+def extract_odds_script(driver):
+    """
+    Extract the betting table of the loaded match page with one execute_script call.
+
+    Returns:
+        dict: Contains 'teams' (list of team names), 'odds' (list of provider odds)
+        and 'table' (the same odds as an OddsTable, prices parsed to float).
+    """
+    odds_data = []
+    result = driver.execute_script(EXTRACT_ODDS_SCRIPT)
+    if not result or not result['teams']:
+        raise ValueError("Betting section not found")
+    team_1_name = result['teams'][0]
+    team_2_name = result['teams'][-1]
+
+    for row in result['rows']:
+        # Skip rows with the "noOdds" class, or without odds cells or provider link
+        if "noOdds" in row['className'] or not row['odds'] or row['provider'] is None:
+            continue
+        provider_name = row['provider']
+        team_1_odds = row['odds'][0] or "-"
+        team_2_odds = row['odds'][-1] or "-"
+
+        # Ensure odds are valid (numbers, not "-")
+        if not team_1_odds.replace('.', '', 1).isdigit() or not team_2_odds.replace('.', '', 1).isdigit():
+            logger.debug("Invalid odds detected for provider: %s", provider_name)
+            INVALID_ODDS.inc()
+            continue
+
+        odds_data.append({
+            "provider": provider_name,
+            team_1_name: team_1_odds,
+            team_2_name: team_2_odds,
+        })
+
+    return {
+        'teams': [team_1_name, team_2_name],
+        'odds': odds_data,
+        'table': OddsTable.from_odds_data([team_1_name, team_2_name], odds_data)
+    }
+
+def extract_match_element(match, start=None, end=None):
+    """
+    Extract one upcomingMatch element.
+
+    The start time is read first, so a match outside [start, end] costs a single
+    WebDriver call and none of its other fields are read.
+
+    Returns:
+        tuple: (match_datetime, match_data), or None if the match is out of range
+        or could not be read.
+    """
+    try:
+        unix_time = int(match.get_attribute("data-zonedgrouping-entry-unix"))
+        match_datetime = datetime.fromtimestamp(unix_time / 1000)
+
+        # Check if match is within the date range
+        if not in_date_range(match_datetime, start, end):
+            return None
+
+        # Get match link
+        match_link = match.find_element(By.CSS_SELECTOR, "a.match").get_attribute("href")
+
+        # Get match time
+        time_element = match.find_element(By.CLASS_NAME, "matchTime")
+        match_time = time_element.text.strip()
+
+        # Get teams
+        team_elements = match.find_elements(By.CLASS_NAME, "matchTeam")
+        teams = []
+        for team_element in team_elements:
+            team_name = team_element.find_element(By.CLASS_NAME, "matchTeamName").text.strip()
+            team_logo = get_team_logo(team_element)
+            teams.append({
+                "name": team_name,
+                "logo": team_logo
+            })
+
+        # Get match format
+        match_format = get_match_format(match)
+
+        # Get event information
+        event_logo, event_name = get_event_info(match)
+
+        # Create match data structure
+        return match_datetime, {
+            'date': match_datetime.strftime('%Y-%m-%d'),
+            'time': match_time,
+            'teams': teams,
+            'format': match_format,
+            'event': {
+                'name': event_name,
+                'logo': event_logo
+            },
+            'link': match_link
+        }
+
     except Exception as e:
-        print(f"Error during scraping: {e}")
-        
-    finally:
-        print("Closing browser...")
-        driver.quit()
-    
-    return matches_by_week
+        logger.warning("Error processing match: %s", e)
+        return None
 
-def scrape_matches_for_days(days=5):
-    """Scrape matches for a specific number of days starting from today."""
-    print("Setting up Chrome driver...")
-    driver = setup_driver()
-    matches_for_days = []
-    
+def iter_upcoming_matches(driver=None, single_pass=False, handle_consent=True, start=None, end=None):
+    """
+    Yield upcoming matches from the /matches page as soon as each one is extracted.
+
+    Args:
+        driver (WebDriver, optional): Existing driver to reuse. When omitted a new
+            driver is started and closed once the iterator is exhausted or closed.
+        single_pass (bool): Extract the whole list with one execute_script call
+            instead of several find_element/get_attribute calls per match. The
+            page is then released before the first match is yielded, so the same
+            driver can load match pages while the list is being consumed.
+            Otherwise the driver must stay on the list page until iteration ends.
+        handle_consent (bool): Look for the cookie consent popup after loading the
+            page. Pass False once consent has been accepted in this session.
+        start (datetime, optional): Skip matches starting before this time.
+        end (datetime, optional): Skip matches starting after this time.
+
+    Yields:
+        tuple: (match_datetime, match_data) in page order.
+    """
+    owns_driver = driver is None
+    if owns_driver:
+        logger.info("Setting up Chrome driver...")
+        driver = setup_driver()
+    calls = WebDriverCallCounter(driver).start()
+    extracted = []
+
+    timer = PageTimer()
     try:
-        print("Attempting to access HLTV.org...")
-        driver.get('https://www.hltv.org/matches')
-        
-        handle_cookie_consent(driver)
-        
-        print("Waiting for page to load...")
-        wait = WebDriverWait(driver, 20)
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "upcomingMatchesWrapper")))
-        time.sleep(3)
-        
-        print("Page loaded successfully. Extracting matches...")
-        match_elements = driver.find_elements(By.CLASS_NAME, "upcomingMatch")
-        
-        today = datetime.today()
-        end_date = today + timedelta(days=days)
-        
-        for match in match_elements:
-            try:
-                # Get match link
-                match_link = match.find_element(By.CSS_SELECTOR, "a.match").get_attribute("href")
-                
-                # Get match time
-                time_element = match.find_element(By.CLASS_NAME, "matchTime")
-                match_time = time_element.text.strip()
-                unix_time = int(match.get_attribute("data-zonedgrouping-entry-unix"))
-                match_datetime = datetime.fromtimestamp(unix_time / 1000)
-                
-                # Check if match is within the date range
-                if not (today <= match_datetime <= end_date):
+        logger.debug("Attempting to access HLTV.org...")
+        driver.get(MATCHES_URL)
+        timer.lap("navigate")
+
+        if handle_consent:
+            handle_cookie_consent(driver)
+        timer.lap("consent")
+
+        logger.debug("Waiting for page to load...")
+        wait_for_match_list(driver)
+        timer.lap("wait")
+
+        logger.debug("Page loaded successfully. Extracting matches...")
+        if single_pass:
+            extracted = extract_matches_script(driver, start, end)
+            timer.lap("extract")
+        else:
+            for match in driver.find_elements(By.CLASS_NAME, "upcomingMatch"):
+                item = extract_match_element(match, start, end)
+                timer.lap("extract")
+                if item is None:
                     continue
-                
-                # Get teams
-                team_elements = match.find_elements(By.CLASS_NAME, "matchTeam")
-                teams = []
-                for team_element in team_elements:
-                    team_name = team_element.find_element(By.CLASS_NAME, "matchTeamName").text.strip()
-                    team_logo = get_team_logo(team_element)
-                    teams.append({
-                        "name": team_name,
-                        "logo": team_logo
-                    })
-                
-                # Get match format
-                match_format = get_match_format(match)
-                
-                # Get event information
-                event_logo, event_name = get_event_info(match)
-                
-                # Create match data structure
-                match_data = {
-                    'date': match_datetime.strftime('%Y-%m-%d'),
-                    'time': match_time,
-                    'teams': teams,
-                    'format': match_format,
-                    'event': {
-                        'name': event_name,
-                        'logo': event_logo
-                    },
-                    'link': match_link
-                }
-                
-                matches_for_days.append(match_data)
-                
-                print(f"Found match: {teams[0]['name']} vs {teams[1]['name']} ({match_time})")
-                
-            except Exception as e:
-                print(f"Error processing match: {e}")
-                continue
-                
+                match_data = item[1]
+                logger.debug("Found match: %s vs %s (%s)", match_data['teams'][0]['name'], match_data['teams'][1]['name'], match_data['time'])
+                yield item
+                # Time spent by the consumer is not part of this page
+                timer.skip()
+
     except Exception as e:
-        print(f"Error during scraping: {e}")
-        
+        logger.error("Error during scraping: %s", e)
+
     finally:
-        print("Closing browser...")
-        driver.quit()
-    
-    return matches_for_days
+        calls.stop()
+        logger.debug("WebDriver calls for match list page: %d", calls.total)
+        timer.report("match list page")
+        if owns_driver:
+            logger.info("Closing browser...")
+            driver.quit()
+
+    for match_datetime, match_data in extracted:
+        logger.debug("Found match: %s vs %s (%s)", match_data['teams'][0]['name'], match_data['teams'][1]['name'], match_data['time'])
+        yield match_datetime, match_data
+
+def iter_matches_for_days(days=5, driver=None, single_pass=False, handle_consent=True):
+    """
+    Yield the matches of the next days as soon as each one is extracted.
 
-def scrape_match_odds(driver, match_url):
+    Matches outside the range are skipped on their start time alone. Arguments
+    are the same as for iter_upcoming_matches.
+
+    Yields:
+        dict: match_data in page order.
+    """
+    today = datetime.today()
+    for _, match_data in iter_upcoming_matches(driver, single_pass, handle_consent, start=today, end=today + timedelta(days=days)):
+        yield match_data
+
+def group_by_week(matches):
+    """
+    Group (match_datetime, match_data) pairs by week, lazily.
+
+    The match list is in start time order, so each week is yielded as soon as
+    the first match of the following week has been extracted.
+
+    Yields:
+        tuple: (week key, list of match_data).
+    """
+    for key, group in groupby(matches, key=lambda item: week_key(item[0])):
+        yield key, [match_data for _, match_data in group]
+
+def scrape_upcoming_matches(driver=None, single_pass=False, handle_consent=True):
+    """
+    Scrape all upcoming matches grouped by week.
+
+    Arguments are the same as for iter_upcoming_matches.
+
+    Returns:
+        dict: Lists of match_data keyed by week.
+    """
+    matches_by_week = {}
+    for key, matches in group_by_week(iter_upcoming_matches(driver, single_pass, handle_consent)):
+        matches_by_week.setdefault(key, []).extend(matches)
+    return matches_by_week
+
+def scrape_matches_for_days(days=5, driver=None, single_pass=False, handle_consent=True):
+    """
+    Scrape matches for a specific number of days starting from today.
+
+    Arguments are the same as for iter_matches_for_days.
+
+    Returns:
+        list: match_data in page order.
+    """
+    return list(iter_matches_for_days(days, driver, single_pass, handle_consent))
+
+class BettingSectionMissing(Exception):
+    """The match page loaded but has no betting section (common for lower-tier matches)."""
+
+@SCRAPE_ODDS_SECONDS.time(backend="selenium")
+def scrape_match_odds(driver, match_url, handle_consent=True, single_pass=False):
     """
     Extract betting odds for a specific match.
     
     Args:
-        driver (WebDriver): Selenium WebDriver instance.
+        driver (WebDriver): Selenium WebDriver instance. The page is loaded in this
+            driver; no new browser is started.
         match_url (str): URL of the match page to scrape.
+        handle_consent (bool): Look for the cookie consent popup after loading the
+            page. Pass False once consent has been accepted in this session.
+        single_pass (bool): Extract the betting table with one execute_script call
+            instead of several find_element/get_attribute calls per provider row.
     
     Returns:
-        dict: Contains 'teams' (list of team names) and 'odds' (list of provider odds).
+        dict: Contains 'teams' (list of team names), 'odds' (list of provider odds),
+        'table' (the same odds as an OddsTable, prices parsed to float) and
+        'scraped_at' (unix time the page was read), plus 'error' (the message)
+        when the page could not be loaded or read. A page without a betting
+        section has empty 'teams' and no 'error'.
     """
-    print(f"Scraping odds for match: {match_url}")
-    driver = setup_driver()
+    logger.debug("Scraping odds for match: %s", match_url)
+    calls = WebDriverCallCounter(driver).start()
+    timer = PageTimer()
     odds_data = []
     team_1_name = ""
     team_2_name = ""
+    error = None
 
     try:
         # Load the match page
         driver.get(match_url)
+        timer.lap("navigate")
 
         # Handle cookie consent
-        handle_cookie_consent(driver)
+        if handle_consent:
+            handle_cookie_consent(driver)
+        timer.lap("consent")
 
-        # Wait for the betting section to load
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "betting-section")))
+        # Wait for the betting section rows to load
+        try:
+            wait_for_betting_rows(driver)
+        except TimeoutException:
+            raise BettingSectionMissing(match_url) from None
+        timer.lap("wait")
+
+        if single_pass:
+            odds_info = extract_odds_script(driver)
+            odds_info['scraped_at'] = time.time()
+            timer.lap("extract")
+            return odds_info
 
         # Locate the betting section
         betting_section = driver.find_element(By.CLASS_NAME, "betting-section")
@@ -313,7 +873,8 @@ def scrape_match_odds(driver, match_url):
 
                 # Ensure odds are valid (numbers, not "-")
                 if not team_1_odds.replace('.', '', 1).isdigit() or not team_2_odds.replace('.', '', 1).isdigit():
-                    print(f"Invalid odds detected for provider: {provider_name}")
+                    logger.debug("Invalid odds detected for provider: %s", provider_name)
+                    INVALID_ODDS.inc()
                     continue
 
                 # Append valid provider data to the result
@@ -327,145 +888,495 @@ def scrape_match_odds(driver, match_url):
                 # print(f"Error processing provider row: {e}")
                 continue
 
+        timer.lap("extract")
+
+    except BettingSectionMissing:
+        logger.info("No betting section found for match: %s", match_url)
+
     except Exception as e:
-        print(f"Error scraping match odds: {e}")
+        logger.error("Error scraping match odds: %s", e)
+        error = str(e)
 
-    return {
+    finally:
+        calls.stop()
+        logger.debug("WebDriver calls for match page: %d", calls.total)
+        timer.report("match page")
+
+    odds_info = {
         'teams': [team_1_name, team_2_name],
-        'odds': odds_data
+        'odds': odds_data,
+        'table': OddsTable.from_odds_data([team_1_name, team_2_name], odds_data),
+        'scraped_at': time.time()
     }
+    if error is not None:
+        odds_info['error'] = error
+    return odds_info
 
+def scrape_matches_for_days_http(http_session, days=5, driver=None):
+    """
+    Scrape matches for a number of days without a browser, falling back to Selenium.
+
+    Args:
+        http_session (requests.Session): Session created by create_http_session.
+        days (int): Number of days ahead to include.
+        driver (WebDriver, optional): Used with scrape_matches_for_days if the raw
+            HTML cannot be fetched or contains no matches.
+    """
+    try:
+        logger.debug("Fetching %s...", MATCHES_URL)
+        today = datetime.today()
+        matches_for_days = parse_upcoming_matches(fetch_page(http_session, MATCHES_URL), today, today + timedelta(days=days))
+        if matches_for_days:
+            return matches_for_days
+        logger.warning("No matches found in raw HTML")
+    except Exception as e:
+        logger.warning("HTTP fetch failed: %s", e)
+
+    if driver is None:
+        return []
+    logger.info("Falling back to Selenium...")
+    return scrape_matches_for_days(days=days, driver=driver)
+
+def scrape_match_odds_http(http_session, match_url, driver=None, handle_consent=True):
+    """
+    Extract betting odds for a match without a browser, falling back to Selenium.
+
+    Args:
+        http_session (requests.Session): Session created by create_http_session.
+        match_url (str): URL of the match page to scrape.
+        driver (WebDriver, optional): Used with scrape_match_odds if the raw HTML
+            cannot be fetched or has no betting section.
+        handle_consent (bool): Passed to scrape_match_odds on fallback.
+
+    Returns:
+        dict: Contains 'teams' (list of team names) and 'odds' (list of provider odds),
+        plus 'table' (an OddsTable) when a betting section was read and 'scraped_at'.
+    """
+    logger.debug("Fetching odds for match: %s", match_url)
+    odds_info = {'teams': ["", ""], 'odds': []}
+    # Only the HTTP attempt is timed here; the fallback is timed by scrape_match_odds
+    with SCRAPE_ODDS_SECONDS.time(backend="http"):
+        try:
+            odds_info = parse_match_odds(fetch_page(http_session, match_url))
+            odds_info['scraped_at'] = time.time()
+            if not odds_info['teams'][0]:
+                logger.warning("Betting section not found in raw HTML")
+        except Exception as e:
+            logger.warning("HTTP fetch failed: %s", e)
+    if odds_info['teams'][0]:
+        return odds_info
+
+    if driver is None:
+        return odds_info
+    logger.info("Falling back to Selenium...")
+    return scrape_match_odds(driver, match_url, handle_consent=handle_consent)
+
+def scrape_odds_for_matches(driver, matches, consent_handled=False, single_pass=False):
+    """
+    Scrape odds for several matches in one browser session.
+
+    Every match page is loaded in the same driver and the cookie consent popup
+    is only looked for until it has been handled once.
+
+    Args:
+        driver (WebDriver): Selenium WebDriver instance shared by all matches.
+        matches (list): Match dicts as returned by scrape_matches_for_days.
+        consent_handled (bool): True if consent was already accepted in this session
+            (e.g. while loading the match list).
+        single_pass (bool): Passed to scrape_match_odds.
+
+    Yields:
+        tuple: (match, odds_info) for each match, in input order.
+    """
+    for match in matches:
+        odds_info = scrape_match_odds(driver, match['link'], handle_consent=not consent_handled, single_pass=single_pass)
+        consent_handled = True
+        yield match, odds_info
+
+def scrape_odds_for_matches_http(http_session, matches, driver=None, consent_handled=False, single_pass=False):
+    """
+    Scrape odds for several matches over HTTP, falling back to Selenium per match.
+
+    As in scrape_odds_for_matches, the cookie consent popup is only looked for
+    on the first page loaded in the driver, so matches that keep falling back
+    (e.g. when raw requests are blocked) do not each wait for it.
+
+    Args:
+        http_session (requests.Session): Session created by create_http_session.
+        matches (list): Match dicts as returned by scrape_matches_for_days_http.
+        driver (WebDriver, optional): Used with scrape_match_odds for a match whose
+            raw HTML cannot be fetched or has no betting section.
+        consent_handled (bool): True if consent was already accepted in the driver.
+        single_pass (bool): Passed to scrape_match_odds on fallback.
+
+    Yields:
+        tuple: (match, odds_info) for each match, in input order.
+    """
+    for match in matches:
+        odds_info = scrape_match_odds_http(http_session, match['link'])
+        if not odds_info['teams'][0] and driver is not None:
+            logger.info("Falling back to Selenium...")
+            odds_info = scrape_match_odds(driver, match['link'], handle_consent=not consent_handled, single_pass=single_pass)
+            consent_handled = True
+        yield match, odds_info
+
+def scrape_odds_parallel(matches, workers=4, retries=2, backoff=2.0, single_pass=False, pool=None):
+    """
+    Scrape odds for several matches with a bounded pool of browser workers.
+
+    Each worker owns one long-lived driver and pulls match URLs from a shared
+    queue until it is empty. A match whose page could not be loaded or read (a
+    WebDriver or navigation error) is retried by the same worker with exponential
+    backoff; a page without a betting section is not retried.
+
+    Args:
+        matches (list): Match dicts as returned by scrape_matches_for_days.
+        workers (int): Number of drivers to run at once.
+        retries (int): Extra attempts per match after the first failure.
+        backoff (float): Delay in seconds before the first retry, doubled on each attempt.
+        single_pass (bool): Passed to scrape_match_odds.
+        pool (DriverPool, optional): Borrow warmed-up drivers from this pool instead
+            of starting one per worker.
+
+    Returns:
+        list: (match, odds_info) tuples in the same order as matches.
+    """
+    task_queue = queue.Queue()
+    for index, match in enumerate(matches):
+        task_queue.put((index, match))
+    results = [None] * len(matches)
+
+    def worker(worker_id):
+        try:
+            with browser_session() if pool is None else pool.driver() as driver:
+                # Pooled drivers accepted the consent while warming up
+                consent_handled = pool is not None
+                while True:
+                    try:
+                        index, match = task_queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    for attempt in range(retries + 1):
+                        odds_info = scrape_match_odds(driver, match['link'], handle_consent=not consent_handled, single_pass=single_pass)
+                        if 'error' not in odds_info:
+                            consent_handled = True
+                            break
+                        if attempt < retries:
+                            delay = backoff * (2 ** attempt)
+                            logger.warning("[worker %d] Retrying %s in %.1fs...", worker_id, match['link'], delay)
+                            time.sleep(delay)
+                    results[index] = (match, odds_info)
+        except Exception as e:
+            logger.error("[worker %d] Worker stopped: %s", worker_id, e)
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=worker, args=(worker_id,), daemon=True)
+        for worker_id in range(max(1, min(workers, len(matches))))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logger.info("Sweep of %d matches with %d workers took %.2fs", len(matches), len(threads), time.perf_counter() - start)
+
+    # Matches left behind by a crashed worker are reported without odds
+    return [
+        result if result is not None else (match, {'teams': ["", ""], 'odds': []})
+        for match, result in zip(matches, results)
+    ]
+
+def scrape_shard(shard, backend="selenium", single_pass=False, http_session_factory=create_http_session):
+    """
+    Scrape one shard of matches in a worker process.
+
+    The process starts its own driver (selenium backend) or HTTP session (http
+    backend) and keeps it for the whole shard.
+
+    Args:
+        shard (list): (index, match) tuples.
+        backend (str): "selenium" or "http".
+        single_pass (bool): Passed to scrape_match_odds.
+        http_session_factory (callable): Creates the session for the http backend.
+            Must be picklable, e.g. a module-level function.
+
+    Returns:
+        list: (index, odds_info) tuples in shard order.
+    """
+    results = []
+    if backend == "http":
+        http_session = http_session_factory()
+        for index, match in shard:
+            results.append((index, scrape_match_odds_http(http_session, match['link'])))
+        return results
+
+    with browser_session() as driver:
+        for position, (index, match) in enumerate(shard):
+            odds_info = scrape_match_odds(driver, match['link'], handle_consent=position == 0, single_pass=single_pass)
+            results.append((index, odds_info))
+    return results
+
+def scrape_odds_sharded(matches, processes=4, backend="selenium", single_pass=False, http_session_factory=create_http_session):
+    """
+    Scrape odds for several matches across worker processes.
+
+    Page rendering and parsing are CPU-bound, so unlike scrape_odds_parallel this
+    is not limited by the GIL. Matches are deduplicated by link and dealt out
+    round-robin, so every shard gets a similar mix of start times.
+
+    Args:
+        matches (list): Match dicts as returned by scrape_matches_for_days.
+        processes (int): Number of worker processes (and drivers or sessions).
+        backend (str): "selenium" or "http".
+        single_pass (bool): Passed to scrape_match_odds.
+        http_session_factory (callable): Passed to scrape_shard.
+
+    Returns:
+        list: (match, odds_info) tuples in the order of the first occurrence of
+        each link in matches.
+    """
+    by_link = {}
+    for match in matches:
+        by_link.setdefault(match['link'], match)
+    unique = list(by_link.values())
+    indexed = list(enumerate(unique))
+    shards = [indexed[shard::processes] for shard in range(max(1, min(processes, len(unique))))]
+    results = [None] * len(unique)
+
+    start = time.perf_counter()
+    # spawn starts clean interpreters: no inherited driver handles or background threads
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(scrape_shard, shard, backend, single_pass, http_session_factory) for shard in shards]
+        for shard_id, future in enumerate(futures):
+            try:
+                for index, odds_info in future.result():
+                    results[index] = odds_info
+            except Exception as e:
+                logger.error("[shard %d] Shard failed: %s", shard_id, e)
+    logger.info("Sweep of %d matches with %d processes took %.2fs", len(unique), len(shards), time.perf_counter() - start)
+
+    # Matches of a failed shard are reported without odds
+    return [
+        (match, odds_info if odds_info is not None else {'teams': ["", ""], 'odds': []})
+        for match, odds_info in zip(unique, results)
+    ]
+
+@ARBITRAGE_CHECK_SECONDS.time(function="check_arbitrage")
 def check_arbitrage(teams, odds_data, total_investment=100):
     """
     Check for arbitrage opportunities in the given odds data.
     
     Args:
         teams (list): Team names as [team1, team2].
-        odds_data (list): List of provider odds.
+        odds_data (list or OddsTable): List of provider odds, or an already parsed table.
     
     Returns:
         dict: Arbitrage details if found, None otherwise.
     """
-    team1, team2 = teams[0], teams[1]
-    providers = []
-    
-    for entry in odds_data:
-        try:
-            provider = entry['provider']
-            odds1 = float(entry[team1].replace(',', '.'))
-            odds2 = float(entry[team2].replace(',', '.'))
-            providers.append({
-                'provider': provider,
-                team1: odds1,
-                team2: odds2
-            })
-        except (KeyError, ValueError) as e:
-            print(f"Skipping provider {entry['provider']}: {e}")
-            continue
-    
-    min_sum = float('inf')
-    best_pair = None
-    
-    for p1 in providers:
-        for p2 in providers:
-            if p1['provider'] == p2['provider']:
-                continue  # Must be different providers
-            sum_inv = (1 / p1[team1]) + (1 / p2[team2])
-            if sum_inv < min_sum:
-                min_sum = sum_inv
-                best_pair = (p1, p2)
-    
-    if min_sum < 1:
-        return {
-            'team1_provider': best_pair[0]['provider'],
-            'team1_odds': best_pair[0][team1],
-            'team2_provider': best_pair[1]['provider'],
-            'team2_odds': best_pair[1][team2],
-            'arbitrage_percent': (1 - min_sum) * 100,
-            'total_investment': total_investment,
-            'stake_team1': total_investment / (min_sum * best_pair[0][team1]),
-            'stake_team2': total_investment / (min_sum * best_pair[1][team2])
-        }
-    else:
-        return None
+    match = odds_data if isinstance(odds_data, OddsTable) else (teams, odds_data)
+    return scan_arbitrage([match], total_investment_result, total_investment=total_investment)[0]
 
+@ARBITRAGE_CHECK_SECONDS.time(function="check_arbitrage_10_win")
 def check_arbitrage_10_win(teams, odds_data):
     """
     Check for arbitrage opportunities in the given odds data.
     Modified to calculate stakes for fixed $10 profit.
     """
-    team1, team2 = teams[0], teams[1]
-    providers = []
-    
-    for entry in odds_data:
-        try:
-            provider = entry['provider']
-            odds1 = float(entry[team1].replace(',', '.'))
-            odds2 = float(entry[team2].replace(',', '.'))
-            providers.append({
-                'provider': provider,
-                team1: odds1,
-                team2: odds2
-            })
-        except (KeyError, ValueError) as e:
-            print(f"Skipping provider {entry['provider']}: {e}")
-            continue
-    
-    min_sum = float('inf')
-    best_pair = None
-    
-    for p1 in providers:
-        for p2 in providers:
-            if p1['provider'] == p2['provider']:
-                continue
-            sum_inv = (1 / p1[team1]) + (1 / p2[team2])
-            if sum_inv < min_sum:
-                min_sum = sum_inv
-                best_pair = (p1, p2)
-    
-    if min_sum < 1:
-        # Calculate required total investment for $10 profit
-        arbitrage_percent = (1 - min_sum) * 100
-        required_total_investment = 10 / (arbitrage_percent / 100)
-        
-        return {
-            'team1_provider': best_pair[0]['provider'],
-            'team1_odds': best_pair[0][team1],
-            'team2_provider': best_pair[1]['provider'],
-            'team2_odds': best_pair[1][team2],
-            'arbitrage_percent': arbitrage_percent,
-            'required_investment': required_total_investment,
-            'stake_team1': (required_total_investment / min_sum) / best_pair[0][team1],
-            'stake_team2': (required_total_investment / min_sum) / best_pair[1][team2],
-            'guaranteed_profit': 10.00  # Fixed profit
-        }
-    else:
+    match = odds_data if isinstance(odds_data, OddsTable) else (teams, odds_data)
+    return scan_arbitrage([match], fixed_profit_result, profit=10)[0]
+
+@ARBITRAGE_CHECK_SECONDS.time(function="check_arbitrage_batch")
+def check_arbitrage_batch(matches, total_investment=100):
+    """
+    Check many matches for arbitrage in one vectorized pass.
+
+    Args:
+        matches (list): (teams, odds_data) tuples or OddsTables, e.g. from a whole sweep.
+        total_investment (float): Total amount to split across both bets.
+
+    Returns:
+        list: check_arbitrage result (dict or None) per match, in input order.
+    """
+    return scan_arbitrage(matches, total_investment_result, total_investment=total_investment)
+
+@ARBITRAGE_CHECK_SECONDS.time(function="check_arbitrage_10_win_batch")
+def check_arbitrage_10_win_batch(matches):
+    """
+    Check many matches for arbitrage in one vectorized pass, sized for a fixed $10 profit.
+
+    Returns:
+        list: check_arbitrage_10_win result (dict or None) per match, in input order.
+    """
+    return scan_arbitrage(matches, fixed_profit_result, profit=10)
+
+def count_arbitrage(scraped_at=None):
+    """
+    Count a reported arbitrage and record the age of its odds.
+
+    Args:
+        scraped_at (float, optional): Unix time the odds were scraped.
+
+    Returns:
+        float: Seconds from scrape to report, or None without scraped_at.
+    """
+    ARBITRAGES_REPORTED.inc()
+    if scraped_at is None:
         return None
+    odds_age = time.time() - scraped_at
+    ODDS_AGE_SECONDS.set(odds_age)
+    return odds_age
+
+def print_arbitrage(teams, arbitrage, scraped_at=None):
+    """
+    Print a check_arbitrage_10_win result.
+
+    Args:
+        teams (list): Team names as [team1, team2].
+        arbitrage (dict): check_arbitrage_10_win result.
+        scraped_at (float, optional): Unix time the odds were scraped, to report their age.
+    """
+    odds_age = count_arbitrage(scraped_at)
+    print("\n*** Arbitrage Opportunity Found! ***")
+    print(f"Bet on {teams[0]} at {arbitrage['team1_provider']} with odds {arbitrage['team1_odds']:.2f}")
+    print(f"Bet on {teams[1]} at {arbitrage['team2_provider']} with odds {arbitrage['team2_odds']:.2f}")
+    print(f"Arbitrage Percentage: {arbitrage['arbitrage_percent']:.2f}%")
+    print(f"Required Total Investment: ${arbitrage['required_investment']:.2f}")
+    print(f"Stake on {teams[0]}: ${arbitrage['stake_team1']:.2f}")
+    print(f"Stake on {teams[1]}: ${arbitrage['stake_team2']:.2f}")
+    print(f"Guaranteed Profit: ${arbitrage['guaranteed_profit']:.2f}")
+    if odds_age is not None:
+        print(f"Odds Age: {odds_age:.1f}s")
+
+
+def print_portfolio(allocations):
+    """
+    Print an allocate_portfolio result: the stakes per funded opportunity and the totals.
+
+    Args:
+        allocations (list): allocate_portfolio result (None for unfunded opportunities).
+    """
+    funded = [allocation for allocation in allocations if allocation is not None]
+    print("\n*** Portfolio Allocation ***")
+    if not funded:
+        print("No arbitrage opportunity can be funded with the given balances.")
+        return
+    for allocation in funded:
+        print(" vs ".join(allocation['outcomes']) + f" ({allocation['arbitrage_percent']:.2f}%)")
+        if 'link' in allocation:
+            print(f"  Match link: {allocation['link']}")
+        for outcome, provider, odds, stake in zip(allocation['outcomes'], allocation['providers'], allocation['odds'], allocation['stakes']):
+            print(f"  Stake ${stake:.2f} on {outcome} at {provider} with odds {odds:.2f}")
+    print(f"Total Stake: ${sum(allocation['total_investment'] for allocation in funded):.2f}")
+    print(f"Guaranteed Profit: ${sum(allocation['guaranteed_profit'] for allocation in funded):.2f}")
 
 if __name__ == "__main__":
-    print("Starting HLTV scraper for the first two matches...")
-    print("-" * 50)
+    # Diagnostics at or above this level go to stderr ("DEBUG" shows every match and provider row)
+    log_level = "INFO"
+    configure_logging(log_level)
+
+    # "text" prints a readable report, "ndjson" streams one JSON record per match and per arbitrage
+    output_format = "text"
+    # File for the NDJSON records (None for stdout)
+    output_path = None
+
+    logger.info("Starting HLTV scraper for the first two matches...")
 
     # Set your desired investment amount here
     total_investment = 200  # You can change this value to any amount you want
 
-    # Scrape matches for today
-    matches_for_days = scrape_matches_for_days(days=1)
+    # Number of browsers scraping odds at once (1 = reuse the match list browser)
+    scrape_workers = 1
 
-    if matches_for_days:
-        print("\nScraping odds for the first two matches...")
-        print("=" * 50)
+    # Run the scrape workers as separate processes instead of threads (not limited by the GIL)
+    scrape_processes = False
+
+    # "selenium" drives Chrome for every page, "http" fetches raw HTML and only uses Chrome as a fallback
+    backend = "selenium"
+
+    # Extract each Selenium page with one execute_script call instead of per-element round trips
+    single_pass = True
+
+    # Money available per provider, e.g. {"Go to GGBet": 500}; when set, all arbitrages of the
+    # sweep are sized together to maximize the total guaranteed profit (None to disable)
+    provider_balances = None
+    markets = []
+
+    # Directory of the append-only odds time-series store (None to disable)
+    odds_store_dir = "odds_store"
+
+    # On-disk cache in front of the "http" backend's page fetches (None to disable)
+    http_cache_dir = "http_cache"
+
+    # Chrome startup: run without a window, skip images and fonts, and reuse a profile
+    # directory so the cookie consent is only accepted once (None for a fresh profile)
+    headless = False
+    block_resources = False
+    profile_dir = None
+
+    # Serve Prometheus metrics on this local port while the sweep runs (None to disable)
+    metrics_port = None
+    if metrics_port is not None:
+        start_metrics_server(metrics_port)
+
+    sweep_started = time.perf_counter()
+    with browser_session(headless=headless, block_resources=block_resources, profile_dir=profile_dir) as driver, \
+            OddsStore(odds_store_dir) if odds_store_dir else nullcontext() as odds_store, \
+            NDJSONWriter(output_path) if output_format == "ndjson" else nullcontext() as writer:
+        # Only the "http" backend fetches raw pages
+        http_session = None
+        if backend == "http":
+            http_session = create_http_session()
+            if http_cache_dir is not None:
+                http_session = CachedSession(http_session, http_cache_dir)
+
+        # A reused profile only has the consent accepted (and marked) on its first run
+        consent_needed = profile_dir is None
+        if profile_dir is not None and not profile_has_consent(profile_dir):
+            warm_up_driver(driver, profile_dir)
+
+        # Scrape matches for today (cookie consent is accepted here, once per session)
+        if backend == "http":
+            matches_for_days = scrape_matches_for_days_http(http_session, days=1, driver=driver)
+        elif single_pass:
+            # The list page is released after one extraction call, so odds scraping
+            # on the same driver starts on the first match instead of after the last
+            matches_for_days = iter_matches_for_days(days=1, driver=driver, single_pass=True, handle_consent=consent_needed)
+        else:
+            matches_for_days = scrape_matches_for_days(days=1, driver=driver, handle_consent=consent_needed)
+
+        matches_for_days = iter(matches_for_days)
+        first_match = next(matches_for_days, None)
+        if first_match is not None:
+            matches_for_days = chain([first_match], matches_for_days)
+            if writer is None:
+                print("\nScraping odds for the first two matches...")
+                print("=" * 50)
+
+            if backend == "http":
+                results = scrape_odds_for_matches_http(
+                    http_session, matches_for_days, driver=driver, consent_handled=not consent_needed, single_pass=single_pass
+                )
+            elif scrape_workers > 1 and scrape_processes:
+                results = scrape_odds_sharded(list(matches_for_days), processes=scrape_workers, single_pass=single_pass)
+            elif scrape_workers > 1:
+                results = scrape_odds_parallel(list(matches_for_days), workers=scrape_workers, single_pass=single_pass)
+            else:
+                # results = scrape_odds_for_matches(driver, matches_for_days[:2], consent_handled=True, single_pass=single_pass)  # Only take the first two matches
+                results = scrape_odds_for_matches(driver, matches_for_days, consent_handled=True, single_pass=single_pass)
+
+            for i, (match, odds_info) in enumerate(results):
+                if writer is None:
+                    print(f"Match {i + 1}: {match['teams'][0]['name']} vs {match['teams'][1]['name']}")
+                    print(f"Match link: {match['link']}")
+                else:
+                    writer.write(match_record(match, odds_info))
+
+                if odds_store is not None:
+                    odds_store.append(match['link'], odds_info)
+
+                if provider_balances is not None and odds_info['odds']:
+                    markets.append({'link': match['link'], **market_from_odds_info(odds_info)})
 
-        driver = setup_driver()
-        try:
-            # for i, match in enumerate(matches_for_days[:2]):  # Only take the first two matches
-            for i, match in enumerate(matches_for_days):  # Only take the first two matches
-                print(f"Match {i + 1}: {match['teams'][0]['name']} vs {match['teams'][1]['name']}")
-                print(f"Match link: {match['link']}")
-
-                # Scrape odds for the match
-                # Scrape odds for the match
-                odds_info = scrape_match_odds(driver, match['link'])
                 if odds_info['odds']:
                     # print("\nOdds for this match:")
                     # for entry in odds_info['odds']:
@@ -487,22 +1398,33 @@ if __name__ == "__main__":
                     #     profit = arbitrage['total_investment'] / (1 - arbitrage['arbitrage_percent'] / 100) - arbitrage['total_investment']
                     #     print(f"Total Stake: ${total_stake:.2f}")
                     #     print(f"Guaranteed Profit: ${profit:.2f}")
-                    arbitrage = check_arbitrage_10_win(odds_info['teams'], odds_info['odds'])
-                    if arbitrage:
-                        print("\n*** Arbitrage Opportunity Found! ***")
-                        print(f"Bet on {odds_info['teams'][0]} at {arbitrage['team1_provider']} with odds {arbitrage['team1_odds']:.2f}")
-                        print(f"Bet on {odds_info['teams'][1]} at {arbitrage['team2_provider']} with odds {arbitrage['team2_odds']:.2f}")
-                        print(f"Arbitrage Percentage: {arbitrage['arbitrage_percent']:.2f}%")
-                        print(f"Required Total Investment: ${arbitrage['required_investment']:.2f}")
-                        print(f"Stake on {odds_info['teams'][0]}: ${arbitrage['stake_team1']:.2f}")
-                        print(f"Stake on {odds_info['teams'][1]}: ${arbitrage['stake_team2']:.2f}")
-                        print(f"Guaranteed Profit: ${arbitrage['guaranteed_profit']:.2f}")
-                    else:
+                    arbitrage = check_arbitrage_10_win(odds_info['teams'], odds_table(odds_info))
+                    if arbitrage and writer is not None:
+                        odds_age = count_arbitrage(odds_info.get('scraped_at'))
+                        writer.write(arbitrage_record(match, odds_info, arbitrage, odds_age))
+                    elif arbitrage:
+                        print_arbitrage(odds_info['teams'], arbitrage, scraped_at=odds_info.get('scraped_at'))
+                    elif writer is None:
                         print("\nNo arbitrage opportunity found for this match.")
-                else:
+                elif writer is None:
                     print("No valid odds found for this match.")
-                print("-" * 50)
-        finally:
-            driver.quit()
-    else:
-        print("\nNo matches found for today.")
+                if writer is None:
+                    print("-" * 50)
+        else:
+            logger.info("No matches found for today.")
+
+        if provider_balances is not None:
+            allocations = allocate_portfolio(solve_markets(markets), provider_balances)
+            if writer is None:
+                print_portfolio(allocations)
+            else:
+                for allocation in filter(None, allocations):
+                    writer.write({'type': 'allocation', **allocation})
+
+    if isinstance(http_session, CachedSession):
+        http_session.report()
+        http_session.session.close()
+    if http_session is not None:
+        http_session.close()
+    record_sweep("main", time.perf_counter() - sweep_started)
+    print_timing_profile()
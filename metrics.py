@@ -0,0 +1,265 @@
+"""
+Prometheus-style metrics.
+
+Counters, gauges and latency histograms are kept in process and served in the
+Prometheus text exposition format by a small local HTTP server:
+
+    start_metrics_server(9108)   # http://127.0.0.1:9108/metrics
+
+Sweeps record their duration next to the configured refresh interval, so a
+scrape that can no longer keep up can be alerted on with
+
+    hltv_sweep_duration_seconds > hltv_refresh_interval_seconds
+"""
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Page loads take seconds, arbitrage checks microseconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = []
+_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named metric with optional labels, registered on creation."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labels)
+
+    def samples(self):
+        """Yield (suffix, label string, value) for the exposition format."""
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self.samples()]
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count. Names end in _total."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with _lock:
+            values = dict(self._values)
+        if not self.labels and not values:
+            values[()] = 0
+        for key, value in values.items():
+            yield '', _format_labels(self.labels, key), value
+
+
+class Gauge(Metric):
+    """Value that can go up and down, e.g. the age of the last reported odds."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels))
+
+    def samples(self):
+        with _lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield '', _format_labels(self.labels, key), value
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __call__(self, func):
+        # The start time is local to each call, so concurrent calls do not share it
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.histogram.observe(time.perf_counter() - started, **self.labels)
+        return wrapper
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._started, **self.labels)
+        return False
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets, plus their sum and count.
+
+    Args:
+        buckets (sequence): Upper bounds in increasing order; +Inf is added.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+
+    def time(self, **labels):
+        """Observe the duration of a with block or of every call to a decorated function."""
+        return _Timer(self, labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return sum(state['counts']) if state else 0
+
+    def samples(self):
+        with _lock:
+            values = {key: {'counts': list(state['counts']), 'sum': state['sum']} for key, state in self._values.items()}
+        for key, state in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                yield '_bucket', _format_labels(self.labels, key, ('le', _format_value(float(bound)))), cumulative
+            yield '_sum', _format_labels(self.labels, key), state['sum']
+            yield '_count', _format_labels(self.labels, key), cumulative
+
+
+def render_metrics():
+    """Return every registered metric in the Prometheus text format."""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrape requests out of the scraper's output
+        pass
+
+
+def start_metrics_server(port=9108, host='127.0.0.1'):
+    """
+    Serve /metrics from a background thread.
+
+    Returns:
+        ThreadingHTTPServer: Call shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+DRIVER_SETUP_SECONDS = Histogram(
+    'hltv_driver_setup_seconds', "Time to start a Chrome driver (setup_driver)."
+)
+SCRAPE_ODDS_SECONDS = Histogram(
+    'hltv_scrape_match_odds_seconds', "Time to scrape the odds of one match page.", labels=('backend',)
+)
+ARBITRAGE_CHECK_SECONDS = Histogram(
+    'hltv_arbitrage_check_seconds', "Time spent in the check_arbitrage functions.", labels=('function',)
+)
+INVALID_ODDS = Counter(
+    'hltv_invalid_odds_total', "Provider rows dropped because their odds are not numbers."
+)
+COOKIE_CHECKS = Counter(
+    'hltv_cookie_consent_checks_total', "Pages on which the cookie consent popup was looked for."
+)
+COOKIE_POPUPS = Counter(
+    'hltv_cookie_popup_total', "Pages on which the cookie consent popup appeared and was accepted."
+)
+ARBITRAGES_REPORTED = Counter(
+    'hltv_arbitrages_reported_total', "Arbitrage opportunities reported."
+)
+ODDS_AGE_SECONDS = Gauge(
+    'hltv_odds_age_seconds', "Age of the odds behind the last reported arbitrage, from scrape to report."
+)
+SWEEP_DURATION_SECONDS = Gauge(
+    'hltv_sweep_duration_seconds', "Duration of the last full sweep or poll cycle.", labels=('mode',)
+)
+REFRESH_INTERVAL_SECONDS = Gauge(
+    'hltv_refresh_interval_seconds', "Configured time between sweeps or poll cycles.", labels=('mode',)
+)
+LAST_SWEEP_TIMESTAMP = Gauge(
+    'hltv_last_sweep_timestamp_seconds', "Unix time at which the last sweep or poll cycle finished.", labels=('mode',)
+)
+
+
+def record_sweep(mode, duration, interval=None):
+    """Record a finished sweep, and the refresh interval it has to fit in if there is one."""
+    SWEEP_DURATION_SECONDS.set(duration, mode=mode)
+    LAST_SWEEP_TIMESTAMP.set(time.time(), mode=mode)
+    if interval is not None:
+        REFRESH_INTERVAL_SECONDS.set(interval, mode=mode)
@@ -0,0 +1,235 @@
+"""
+Append-only odds time-series store.
+
+Every scrape is appended as one row per provider to a set of column files
+(timestamp, match id, provider id, team 1 odds, team 2 odds), each a flat
+little-endian array that is read back through numpy.memmap. A SQLite database
+interns match links and provider names and indexes each snapshot by
+(match, timestamp) -> row range, so a range query only touches the rows it
+needs no matter how many months of polling are stored.
+
+    python odds_store.py odds_store https://www.hltv.org/matches/... --provider "Go to GGBet" --since 3600
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import numpy as np
+
+from records import odds_table
+
+COLUMNS = {
+    'timestamp': np.dtype('<f8'),
+    'match_id': np.dtype('<i4'),
+    'provider_id': np.dtype('<i4'),
+    'team1_odds': np.dtype('<f8'),
+    'team2_odds': np.dtype('<f8'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    link TEXT UNIQUE NOT NULL,
+    team1 TEXT,
+    team2 TEXT
+);
+CREATE TABLE IF NOT EXISTS providers (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    match_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    start_row INTEGER NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_match_time ON snapshots (match_id, timestamp);
+"""
+
+
+class OddsStore:
+    """
+    Append-only columnar store of scraped odds.
+
+    Args:
+        directory (str): Directory holding the column files and index.sqlite.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite'))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._match_ids = {}
+        self._provider_ids = dict(self.db.execute("SELECT name, id FROM providers"))
+        self._provider_names = {provider_id: name for name, provider_id in self._provider_ids.items()}
+        self._memmaps = {}
+
+        # Rows past the last indexed snapshot belong to an interrupted append; drop them
+        indexed_rows = self.db.execute("SELECT COALESCE(MAX(start_row + row_count), 0) FROM snapshots").fetchone()[0]
+        self._files = {}
+        for column, dtype in COLUMNS.items():
+            f = open(self._column_path(column), 'ab')
+            f.truncate(indexed_rows * dtype.itemsize)
+            self._files[column] = f
+        self.rows = indexed_rows
+
+    def _column_path(self, column):
+        return os.path.join(self.directory, f'{column}.bin')
+
+    def _match_id(self, link, teams):
+        match_id = self._match_ids.get(link)
+        if match_id is None:
+            row = self.db.execute("SELECT id FROM matches WHERE link = ?", (link,)).fetchone()
+            if row is None:
+                match_id = self.db.execute(
+                    "INSERT INTO matches (link, team1, team2) VALUES (?, ?, ?)", (link, teams[0], teams[1])
+                ).lastrowid
+            else:
+                match_id = row[0]
+            self._match_ids[link] = match_id
+        return match_id
+
+    def _provider_id(self, name):
+        provider_id = self._provider_ids.get(name)
+        if provider_id is None:
+            provider_id = self.db.execute("INSERT INTO providers (name) VALUES (?)", (name,)).lastrowid
+            self._provider_ids[name] = provider_id
+            self._provider_names[provider_id] = name
+        return provider_id
+
+    def append(self, match_link, odds_info, timestamp=None):
+        """
+        Append one scrape_match_odds result.
+
+        Args:
+            match_link (str): Match page URL the odds were scraped from.
+            odds_info (dict): Result of scrape_match_odds.
+            timestamp (float, optional): Unix time of the scrape; defaults to the
+                result's 'scraped_at', or now if it has none.
+
+        Returns:
+            int: Number of provider rows written.
+        """
+        table = odds_table(odds_info)
+        if not len(table):
+            return 0
+        if timestamp is None:
+            timestamp = odds_info.get('scraped_at') or time.time()
+        n = len(table)
+
+        match_id = self._match_id(match_link, table.teams)
+        columns = {
+            'timestamp': np.full(n, timestamp),
+            'match_id': np.full(n, match_id),
+            'provider_id': np.array([self._provider_id(name) for name in table.providers]),
+            'team1_odds': table.odds[:, 0],
+            'team2_odds': table.odds[:, 1],
+        }
+        # Data first, index second: a crash between the two leaves unindexed rows that are dropped on reopen
+        for column, dtype in COLUMNS.items():
+            f = self._files[column]
+            f.write(columns[column].astype(dtype).tobytes())
+            f.flush()
+
+        self.db.execute(
+            "INSERT INTO snapshots (match_id, timestamp, start_row, row_count) VALUES (?, ?, ?, ?)",
+            (match_id, timestamp, self.rows, n)
+        )
+        self.db.commit()
+        self.rows += n
+        return n
+
+    def _column(self, column):
+        cached = self._memmaps.get(column)
+        if cached is None or len(cached) != self.rows:
+            cached = np.memmap(self._column_path(column), dtype=COLUMNS[column], mode='r', shape=(self.rows,))
+            self._memmaps[column] = cached
+        return cached
+
+    def query(self, match_link, provider=None, start=None, end=None):
+        """
+        Read the stored odds of one match.
+
+        Args:
+            match_link (str): Match page URL.
+            provider (str, optional): Only return rows of this provider name.
+            start (float, optional): Earliest unix time to include.
+            end (float, optional): Latest unix time to include.
+
+        Returns:
+            dict: 'teams', 'timestamp', 'provider', 'team1_odds' and 'team2_odds',
+            in scrape order. The numeric columns are numpy arrays.
+        """
+        result = {'teams': None, 'timestamp': np.empty(0), 'provider': [],
+                  'team1_odds': np.empty(0), 'team2_odds': np.empty(0)}
+        match = self.db.execute("SELECT id, team1, team2 FROM matches WHERE link = ?", (match_link,)).fetchone()
+        if match is None:
+            return result
+        result['teams'] = [match[1], match[2]]
+
+        sql = "SELECT start_row, row_count FROM snapshots WHERE match_id = ?"
+        params = [match[0]]
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND timestamp <= ?"
+            params.append(end)
+        ranges = np.array(self.db.execute(sql + " ORDER BY timestamp", params).fetchall(), dtype=np.int64).reshape(-1, 2)
+        if not len(ranges):
+            return result
+
+        # Expand (start_row, row_count) pairs into row numbers without a Python loop
+        starts, counts = ranges[:, 0], ranges[:, 1]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.repeat(starts, counts) + offsets
+
+        provider_ids = self._column('provider_id')[rows]
+        if provider is not None:
+            provider_id = self._provider_ids.get(provider)
+            if provider_id is None:
+                return result
+            keep = provider_ids == provider_id
+            rows, provider_ids = rows[keep], provider_ids[keep]
+
+        result['timestamp'] = np.asarray(self._column('timestamp')[rows])
+        result['provider'] = [self._provider_names[provider_id] for provider_id in provider_ids.tolist()]
+        result['team1_odds'] = np.asarray(self._column('team1_odds')[rows])
+        result['team2_odds'] = np.asarray(self._column('team2_odds')[rows])
+        return result
+
+    def close(self):
+        self._memmaps.clear()
+        for f in self._files.values():
+            f.close()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query stored odds for a match")
+    parser.add_argument("directory", help="odds store directory")
+    parser.add_argument("match_link", help="match page URL")
+    parser.add_argument("--provider", help="provider name, e.g. 'Go to GGBet'")
+    parser.add_argument("--since", type=float, help="only show the last N seconds")
+    args = parser.parse_args()
+
+    with OddsStore(args.directory) as store:
+        start = time.time() - args.since if args.since is not None else None
+        odds = store.query(args.match_link, provider=args.provider, start=start)
+        if odds['teams'] is None:
+            print("Match not found in store.")
+        else:
+            print(f"{'Time':<20} {'Provider':<25} {odds['teams'][0]:>12} {odds['teams'][1]:>12}")
+            for ts, provider, odds1, odds2 in zip(odds['timestamp'], odds['provider'], odds['team1_odds'], odds['team2_odds']):
+                print(f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S'):<20} {provider:<25} {odds1:>12.2f} {odds2:>12.2f}")
@@ -0,0 +1,146 @@
+"""
+Streaming NDJSON output.
+
+Instead of the text report, a sweep can write one JSON object per line, so its
+results can be piped into other services:
+
+    python replay.py run fixtures --ndjson | jq 'select(.type == "arbitrage")'
+
+Every record has a "type": "match" for each scraped match (teams, link and
+provider odds), "arbitrage" for each opportunity found and, in main.py with
+provider balances set, "allocation" for the stakes of the portfolio. Lines are
+collected in memory and written in blocks of buffer_size characters. They are
+also flushed at least every flush_interval seconds, so a reader downstream of
+a slow sweep is never far behind.
+
+Diagnostics go through logging to stderr (configure_logging), so stdout only
+carries records.
+"""
+import json
+import logging
+import sys
+import time
+
+from records import odds_table
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def configure_logging(level="INFO"):
+    """Send log records at or above level to stderr, keeping stdout for the report or NDJSON records."""
+    logging.basicConfig(level=getattr(logging, str(level).upper()), format=LOG_FORMAT, stream=sys.stderr)
+
+
+def _json_default(value):
+    # NumPy scalars and arrays from the odds tables
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# json.dumps with non-default options builds a new encoder on every call
+_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=_json_default)
+
+
+class NDJSONWriter:
+    """
+    Buffered writer of one JSON record per line.
+
+    Args:
+        output (str or file, optional): Path to write to, an open text stream, or
+            None for stdout. A path is opened (and closed) by the writer.
+        buffer_size (int): Characters collected before they are written.
+        flush_interval (float): Seconds after which buffered records are written
+            even if the buffer is not full.
+    """
+
+    def __init__(self, output=None, buffer_size=64 * 1024, flush_interval=1.0):
+        self._owns_stream = isinstance(output, str)
+        if self._owns_stream:
+            self.stream = open(output, 'w', encoding='utf-8')
+        else:
+            self.stream = output if output is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._lines = []
+        self._buffered = 0
+        self._flushed_at = time.monotonic()
+        self.records = 0
+        self.writes = 0
+        self.bytes_written = 0
+
+    def write(self, record):
+        """Queue one record (a JSON-serializable dict)."""
+        line = _encoder.encode(record) + '\n'
+        self._lines.append(line)
+        self._buffered += len(line)
+        self.records += 1
+        if self._buffered >= self.buffer_size or time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records in one call."""
+        if self._lines:
+            chunk = ''.join(self._lines)
+            self.stream.write(chunk)
+            self.writes += 1
+            self.bytes_written += len(chunk.encode('utf-8'))
+            self._lines = []
+            self._buffered = 0
+        self.stream.flush()
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._owns_stream:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def match_record(match, odds_info):
+    """
+    Build the "match" record of a scraped match.
+
+    Args:
+        match (dict): Match list entry (link, date, time, teams, event).
+        odds_info (dict): scrape_match_odds result for the match.
+    """
+    table = odds_table(odds_info)
+    return {
+        'type': 'match',
+        'link': match['link'],
+        'date': match.get('date'),
+        'time': match.get('time'),
+        'event': (match.get('event') or {}).get('name'),
+        'teams': list(table.teams),
+        'odds': [
+            {'provider': provider, 'odds': row}
+            for provider, row in zip(table.providers, table.odds.tolist())
+        ],
+        'scraped_at': odds_info.get('scraped_at'),
+    }
+
+
+def arbitrage_record(match, odds_info, arbitrage, odds_age=None):
+    """
+    Build the "arbitrage" record of an opportunity.
+
+    Args:
+        match (dict): Match list entry.
+        odds_info (dict): scrape_match_odds result the arbitrage was found in.
+        arbitrage (dict): check_arbitrage_10_win (or check_arbitrage) result.
+        odds_age (float, optional): Seconds from scrape to report.
+    """
+    return {
+        'type': 'arbitrage',
+        'link': match['link'],
+        'teams': list(odds_info['teams']),
+        **arbitrage,
+        'scraped_at': odds_info.get('scraped_at'),
+        'odds_age': odds_age,
+    }
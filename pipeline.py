@@ -0,0 +1,234 @@
+"""
+Asyncio scraping pipeline.
+
+Match discovery, odds fetching, arbitrage checks and reporting run as
+concurrent stages joined by bounded queues:
+
+    discover -> [match queue] -> fetch workers -> [odds queue] -> arbitrage -> [report queue] -> report
+
+Selenium and requests are blocking, so every page load runs in a worker
+thread; each fetch worker owns one driver. A slow match page only holds up
+its own worker while the other stages keep going.
+
+    python pipeline.py --workers 3 --days 1
+    python pipeline.py --backend http --ndjson > sweep.ndjson
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from contextlib import nullcontext
+
+from main import (
+    check_arbitrage_10_win,
+    count_arbitrage,
+    create_http_session,
+    print_arbitrage,
+    print_timing_profile,
+    scrape_match_odds,
+    scrape_match_odds_http,
+    scrape_matches_for_days_http,
+    iter_matches_for_days,
+    setup_driver,
+)
+from http_cache import CachedSession
+from metrics import record_sweep, start_metrics_server
+from output import NDJSONWriter, arbitrage_record, configure_logging, match_record
+from records import odds_table
+
+logger = logging.getLogger(__name__)
+
+# Sentinel marking the end of a stage's output
+DONE = object()
+
+
+async def discover(match_queue, workers, days, single_pass, backend="selenium", http_session=None):
+    """
+    Stream the match list to the fetch workers, each match as soon as it is extracted.
+
+    With the http backend the list page is fetched and parsed without a browser.
+    """
+    try:
+        if backend == "http":
+            matches = await asyncio.to_thread(scrape_matches_for_days_http, http_session or create_http_session(), days)
+            for match in matches:
+                await match_queue.put(match)
+        else:
+            matches = iter_matches_for_days(days=days, single_pass=single_pass)
+            try:
+                while (match := await asyncio.to_thread(next, matches, DONE)) is not DONE:
+                    await match_queue.put(match)
+            finally:
+                await asyncio.to_thread(matches.close)
+    finally:
+        for _ in range(workers):
+            await match_queue.put(DONE)
+
+
+async def fetch_worker(worker_id, match_queue, odds_queue, backend, single_pass, alive, http_session=None):
+    """Fetch odds for matches from match_queue with one long-lived driver or HTTP session."""
+    driver = None
+    try:
+        if backend == "http":
+            http_session = http_session or create_http_session()
+        else:
+            driver = await asyncio.to_thread(setup_driver)
+    except Exception as e:
+        logger.error("[worker %d] Could not start driver: %s", worker_id, e)
+        alive[0] -= 1
+        # The last worker standing must keep consuming so discovery never blocks
+        if alive[0] == 0:
+            while (match := await match_queue.get()) is not DONE:
+                await odds_queue.put((match, {'teams': ["", ""], 'odds': []}, time.perf_counter()))
+        await odds_queue.put(DONE)
+        return
+
+    try:
+        consent_handled = False
+        while (match := await match_queue.get()) is not DONE:
+            fetch_started = time.perf_counter()
+            try:
+                if backend == "http":
+                    odds_info = await asyncio.to_thread(scrape_match_odds_http, http_session, match['link'])
+                else:
+                    odds_info = await asyncio.to_thread(
+                        scrape_match_odds, driver, match['link'],
+                        handle_consent=not consent_handled, single_pass=single_pass
+                    )
+                    consent_handled = True
+            except Exception as e:
+                logger.error("[worker %d] Error scraping %s: %s", worker_id, match['link'], e)
+                odds_info = {'teams': ["", ""], 'odds': []}
+            await odds_queue.put((match, odds_info, fetch_started))
+
+    finally:
+        if driver is not None:
+            await asyncio.to_thread(driver.quit)
+        await odds_queue.put(DONE)
+
+
+async def check(odds_queue, report_queue, workers):
+    """Run the arbitrage check on each fetched match."""
+    remaining = workers
+    while remaining:
+        item = await odds_queue.get()
+        if item is DONE:
+            remaining -= 1
+            continue
+        match, odds_info, fetch_started = item
+        arbitrage = None
+        if odds_info['odds']:
+            arbitrage = check_arbitrage_10_win(odds_info['teams'], odds_table(odds_info))
+        await report_queue.put((match, odds_info, arbitrage, fetch_started))
+    await report_queue.put(DONE)
+
+
+async def report(report_queue, latencies, alert_latencies, reported_at, writer=None):
+    """Print results (or write them to an NDJSONWriter) and record fetch-start to report latency and report times."""
+    while True:
+        item = await report_queue.get()
+        if item is DONE:
+            break
+        match, odds_info, arbitrage, fetch_started = item
+        reported_at.append(time.perf_counter())
+        latency = reported_at[-1] - fetch_started
+        latencies.append(latency)
+
+        if writer is not None:
+            writer.write(match_record(match, odds_info))
+            if arbitrage:
+                alert_latencies.append(latency)
+                odds_age = count_arbitrage(odds_info.get('scraped_at'))
+                writer.write({**arbitrage_record(match, odds_info, arbitrage, odds_age), 'alert_latency': latency})
+            continue
+
+        print(f"{match['teams'][0]['name']} vs {match['teams'][1]['name']}: {match['link']}")
+        if arbitrage:
+            alert_latencies.append(latency)
+            print_arbitrage(odds_info['teams'], arbitrage, scraped_at=odds_info.get('scraped_at'))
+            print(f"Alert latency (fetch start to alert): {latency:.2f}s")
+        elif odds_info['odds']:
+            print("No arbitrage opportunity found for this match.")
+        else:
+            print("No valid odds found for this match.")
+        print("-" * 50)
+
+
+async def run_pipeline(days=1, workers=3, backend="selenium", single_pass=True, queue_size=20, http_cache=None, writer=None):
+    """
+    Run one sweep through the pipeline.
+
+    Args:
+        days (int): Days of upcoming matches to scrape.
+        workers (int): Number of concurrent odds fetch workers.
+        backend (str): "selenium" or "http".
+        single_pass (bool): Passed to the Selenium scrape functions.
+        queue_size (int): Capacity of each inter-stage queue.
+        http_cache (CachedSession, optional): Shared by the http match list fetch and fetch workers.
+        writer (NDJSONWriter, optional): Report stage writes records here instead of printing.
+
+    Returns:
+        dict: 'wall' time, 'first_report' time (sweep start to first reported
+        match, None without matches), per-match 'latencies' and 'alert_latencies'
+        in seconds.
+    """
+    # Room for one DONE per worker even if a worker stops early
+    match_queue = asyncio.Queue(max(queue_size, workers))
+    odds_queue = asyncio.Queue(queue_size)
+    report_queue = asyncio.Queue(queue_size)
+    latencies = []
+    alert_latencies = []
+    reported_at = []
+    alive = [workers]
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        discover(match_queue, workers, days, single_pass, backend, http_cache),
+        *(fetch_worker(worker_id, match_queue, odds_queue, backend, single_pass, alive, http_cache) for worker_id in range(workers)),
+        check(odds_queue, report_queue, workers),
+        report(report_queue, latencies, alert_latencies, reported_at, writer),
+    )
+    return {
+        'wall': time.perf_counter() - started,
+        'first_report': reported_at[0] - started if reported_at else None,
+        'latencies': latencies,
+        'alert_latencies': alert_latencies,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape HLTV odds through an asyncio pipeline")
+    parser.add_argument("--days", type=int, default=1, help="days of upcoming matches to scrape")
+    parser.add_argument("--workers", type=int, default=3, help="concurrent odds fetch workers")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium", help="odds page backend")
+    parser.add_argument("--queue-size", type=int, default=20, help="capacity of each stage queue")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on this local port")
+    parser.add_argument("--http-cache", default=None, help="on-disk page cache directory for the http backend")
+    parser.add_argument("--ndjson", action="store_true", help="write one JSON record per match and arbitrage to stdout")
+    parser.add_argument("--log-level", default="INFO", help="level of the diagnostics written to stderr")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if args.metrics_port is not None:
+        start_metrics_server(args.metrics_port)
+    http_cache = CachedSession(create_http_session(), args.http_cache) if args.http_cache else None
+    with NDJSONWriter() if args.ndjson else nullcontext() as writer:
+        stats = asyncio.run(run_pipeline(
+            days=args.days, workers=args.workers, backend=args.backend, queue_size=args.queue_size,
+            http_cache=http_cache, writer=writer
+        ))
+    record_sweep("pipeline", stats['wall'])
+    if http_cache is not None:
+        http_cache.report()
+        http_cache.session.close()
+        http_cache.close()
+
+    logger.info("Sweep finished in %.2fs (%d matches)", stats['wall'], len(stats['latencies']))
+    if stats['first_report'] is not None:
+        logger.info("First match reported after %.2fs", stats['first_report'])
+    if stats['latencies']:
+        logger.info("Fetch to report latency: median %.2fs, max %.2fs", statistics.median(stats['latencies']), max(stats['latencies']))
+    if stats['alert_latencies']:
+        logger.info("Fetch to alert latency:  median %.2fs, max %.2fs", statistics.median(stats['alert_latencies']), max(stats['alert_latencies']))
+    print_timing_profile()
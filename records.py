@@ -0,0 +1,84 @@
+"""
+Compact odds records.
+
+Scraped odds arrive as one dict per provider keyed by team name strings, e.g.
+{"provider": "Go to GGBet", "Team A": "1.85", "Team B": "2.05"}. OddsTable holds
+the same data as a tuple of interned provider names and one float64 array of
+providers x outcomes: prices are parsed once at scrape time, outcomes are
+addressed by column position and every snapshot of a provider shares one name
+string.
+"""
+import logging
+import sys
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class OddsTable:
+    """
+    Provider odds of one match.
+
+    Args:
+        teams (sequence): Outcome names in column order.
+        providers (sequence): Provider name per row.
+        odds (array-like): Decimal odds of shape (providers, outcomes).
+    """
+
+    __slots__ = ('teams', 'providers', 'odds')
+
+    def __init__(self, teams, providers, odds):
+        self.teams = tuple(teams)
+        self.providers = tuple(sys.intern(name) for name in providers)
+        self.odds = np.asarray(odds, dtype=np.float64).reshape(len(self.providers), len(self.teams))
+
+    @classmethod
+    def from_odds_data(cls, teams, odds_data):
+        """
+        Parse provider odds dicts, as in scrape_match_odds()['odds'].
+
+        Providers whose odds are missing or not numbers are skipped.
+        """
+        providers = []
+        rows = []
+        for entry in odds_data:
+            try:
+                rows.append([float(entry[team].replace(',', '.')) for team in teams])
+                providers.append(entry['provider'])
+            except (KeyError, ValueError) as e:
+                logger.debug("Skipping provider %s: %s", entry['provider'], e)
+                continue
+        return cls(teams, providers, np.array(rows, dtype=np.float64).reshape(len(rows), len(teams)))
+
+    def to_odds_data(self):
+        """Return the odds as provider dicts keyed by team name, the scrape_match_odds shape."""
+        return [
+            {"provider": provider, **{team: str(price) for team, price in zip(self.teams, row)}}
+            for provider, row in zip(self.providers, self.odds.tolist())
+        ]
+
+    def __len__(self):
+        return len(self.providers)
+
+    def __reduce__(self):
+        # Rebuild through __init__ so names are interned again in the receiving process
+        return OddsTable, (self.teams, self.providers, self.odds)
+
+    def __eq__(self, other):
+        if not isinstance(other, OddsTable):
+            return NotImplemented
+        return self.teams == other.teams and self.providers == other.providers and np.array_equal(self.odds, other.odds)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"OddsTable(teams={self.teams!r}, providers={len(self.providers)})"
+
+
+def odds_table(odds_info):
+    """Return the OddsTable of a scrape_match_odds result, parsing its odds dicts if it has none."""
+    table = odds_info.get('table')
+    if table is None:
+        table = OddsTable.from_odds_data(odds_info['teams'], odds_info['odds'])
+    return table
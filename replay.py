@@ -0,0 +1,187 @@
+"""
+Offline replay of recorded HLTV pages.
+
+A recording is a directory of saved pages plus a manifest.json mapping each
+page URL to its file. ReplaySession stands in for the requests session used by
+the HTTP backend, so the normal scrape and arbitrage functions run against the
+recording without network access:
+
+    python replay.py record recordings/today https://www.hltv.org/matches/...   # needs Chrome + network
+    python replay.py run fixtures                                              # offline
+    python replay.py run fixtures --ndjson                                     # JSON records on stdout
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from contextlib import nullcontext
+
+import requests
+
+from http_backend import MATCHES_URL, parse_upcoming_matches
+from main import check_arbitrage_10_win_batch, count_arbitrage, print_arbitrage, scrape_match_odds_http
+from output import NDJSONWriter, arbitrage_record, configure_logging, match_record
+from records import odds_table
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+
+
+def load_manifest(directory):
+    """Return the {url: filename} manifest of a recording directory."""
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def record_pages(driver, urls, directory):
+    """
+    Save the rendered HTML of each URL into a recording directory.
+
+    Args:
+        driver (WebDriver): Selenium WebDriver instance (cookie consent already handled).
+        urls (list): Page URLs to record.
+        directory (str): Recording directory; the manifest is updated in place.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+    for url in urls:
+        logger.info("Recording %s", url)
+        driver.get(url)
+        filename = manifest.get(url) or f"page_{len(manifest):04d}.html"
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+            f.write(driver.page_source)
+        manifest[url] = filename
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+class ReplayResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, url, text, status_code, headers=None):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.encoding = 'utf-8'
+
+    @property
+    def content(self):
+        return self.text.encode(self.encoding)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url} (not recorded)", response=self)
+
+
+class ReplaySession:
+    """
+    Serve recorded pages through the requests.Session.get interface.
+
+    Pages are read from disk once and cached. Unrecorded URLs answer 404.
+    Recorded pages carry an ETag of their content and answer a matching
+    If-None-Match with 304, like a server supporting conditional requests.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest = load_manifest(directory)
+        self._pages = {}
+        self.hits = 0
+        self.misses = 0
+
+    def page(self, url):
+        """Return the recorded HTML for url, or None."""
+        filename = self.manifest.get(url)
+        if filename is None:
+            return None
+        if url not in self._pages:
+            with open(os.path.join(self.directory, filename), encoding='utf-8') as f:
+                self._pages[url] = f.read()
+        return self._pages[url]
+
+    def get(self, url, timeout=None, headers=None):
+        text = self.page(url)
+        if text is None:
+            self.misses += 1
+            return ReplayResponse(url, "", 404)
+        self.hits += 1
+        etag = '"' + hashlib.sha1(text.encode('utf-8')).hexdigest() + '"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return ReplayResponse(url, "", 304, {'ETag': etag})
+        return ReplayResponse(url, text, 200, {'ETag': etag})
+
+
+def replay_sweep(directory):
+    """
+    Run one full sweep (match list, odds, arbitrage) against a recording.
+
+    Match dates are not filtered, since recorded matches are in the past.
+
+    Returns:
+        list: (match, odds_info, arbitrage) tuples in match list order.
+    """
+    session = ReplaySession(directory)
+    matches = parse_upcoming_matches(session.get(MATCHES_URL).text)
+    odds = [scrape_match_odds_http(session, match['link']) for match in matches]
+    arbitrages = check_arbitrage_10_win_batch([odds_table(odds_info) for odds_info in odds])
+    return list(zip(matches, odds, arbitrages))
+
+
+def report_sweep(results, writer=None):
+    """
+    Print replay_sweep results, or write them as NDJSON records.
+
+    Args:
+        results (list): (match, odds_info, arbitrage) tuples from replay_sweep.
+        writer (NDJSONWriter, optional): Write one record per match and arbitrage here instead of printing.
+    """
+    for match, odds_info, arbitrage in results:
+        if writer is not None:
+            writer.write(match_record(match, odds_info))
+            if arbitrage:
+                odds_age = count_arbitrage(odds_info.get('scraped_at'))
+                writer.write(arbitrage_record(match, odds_info, arbitrage, odds_age))
+            continue
+        print(f"{match['teams'][0]['name']} vs {match['teams'][1]['name']}: {len(odds_info['odds'])} providers")
+        if arbitrage:
+            print_arbitrage(odds_info['teams'], arbitrage)
+        print("-" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record HLTV pages or replay them offline")
+    # Options accepted after any subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--log-level", default="INFO", help="level of the diagnostics written to stderr")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", parents=[common], help="save pages with Chrome")
+    record_parser.add_argument("directory", help="recording directory")
+    record_parser.add_argument("urls", nargs="*", help="match page URLs (default: today's matches)")
+
+    run_parser = subparsers.add_parser("run", parents=[common], help="replay a recording without network")
+    run_parser.add_argument("directory", help="recording directory")
+    run_parser.add_argument("--ndjson", action="store_true", help="write one JSON record per match and arbitrage")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if args.command == "record":
+        from main import browser_session, handle_cookie_consent, scrape_matches_for_days
+
+        with browser_session() as driver:
+            if args.urls:
+                driver.get(MATCHES_URL)
+                handle_cookie_consent(driver)
+                urls = args.urls
+            else:
+                urls = [match['link'] for match in scrape_matches_for_days(days=1, driver=driver)]
+            record_pages(driver, [MATCHES_URL] + urls, args.directory)
+    else:
+        with NDJSONWriter() if args.ndjson else nullcontext() as writer:
+            report_sweep(replay_sweep(args.directory), writer)
@@ -0,0 +1,79 @@
+"""
+Regression benchmarks on the fixtures/ recording, run with pytest-benchmark.
+
+Every recorded page is parsed, the parsed odds are scanned for arbitrage and a
+full replay sweep is run, all without network. The peak traced memory of one
+call per page is stored in each benchmark's extra_info ('peak_bytes_per_page')
+and checked against PEAK_BYTES_PER_PAGE:
+
+    python -m pytest --benchmark-autosave                                  # save a run to .benchmarks/
+    python -m pytest --benchmark-compare --benchmark-compare-fail=min:25%  # fail on a slowdown against it
+"""
+import os
+import tracemalloc
+
+import pytest
+
+from http_backend import MATCHES_URL, parse_match_odds, parse_upcoming_matches
+from main import check_arbitrage_batch
+from replay import ReplaySession, load_manifest, replay_sweep
+
+RECORDING = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+MANIFEST = load_manifest(RECORDING)
+
+# The recorded sweep is repeated to this many matches for the scan benchmark
+SWEEP_COPIES = 500
+
+# Peak traced memory allowed per page; the fixture pages need a few KiB
+PEAK_BYTES_PER_PAGE = 64 * 1024
+
+
+def peak_bytes(func):
+    """Return the peak traced memory of one call of func."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def record_peak(benchmark, func, pages=1):
+    benchmark.extra_info['peak_bytes_per_page'] = peak = peak_bytes(func) / pages
+    assert peak <= PEAK_BYTES_PER_PAGE, f"peak {peak:.0f} bytes per page > {PEAK_BYTES_PER_PAGE}"
+
+
+@pytest.fixture(scope="module")
+def session():
+    return ReplaySession(RECORDING)
+
+
+@pytest.fixture(scope="module")
+def recorded_odds(session):
+    return [parse_match_odds(session.page(url)) for url in MANIFEST if url != MATCHES_URL]
+
+
+@pytest.mark.parametrize("url", list(MANIFEST), ids=list(MANIFEST.values()))
+def test_parse_page(benchmark, session, url):
+    page_html = session.page(url)
+    parse = parse_upcoming_matches if url == MATCHES_URL else parse_match_odds
+    result = benchmark(parse, page_html)
+    record_peak(benchmark, lambda: parse(page_html))
+    if parse is parse_match_odds:
+        assert all(result['teams']) and result['odds']
+    else:
+        assert all(match['link'] in MANIFEST for match in result)
+
+
+def test_arbitrage_scan(benchmark, recorded_odds):
+    sweep = [(odds_info['teams'], odds_info['odds']) for odds_info in recorded_odds] * SWEEP_COPIES
+    results = benchmark(check_arbitrage_batch, sweep)
+    record_peak(benchmark, lambda: check_arbitrage_batch(sweep), len(sweep))
+    assert len(results) == len(sweep)
+
+
+def test_replay_sweep(benchmark):
+    results = benchmark(replay_sweep, RECORDING)
+    record_peak(benchmark, lambda: replay_sweep(RECORDING), len(MANIFEST))
+    assert [match['link'] for match, _, _ in results] == [url for url in MANIFEST if url != MATCHES_URL]
+    assert all(odds_info['odds'] for _, odds_info, _ in results)
@@ -0,0 +1,263 @@
+"""
+Near-arbitrage watchlist.
+
+A match is an arbitrage when its best implied-probability sum (1 / team 1 odds
+plus 1 / team 2 odds, from two different providers) is below 1. The watchlist
+keeps every tracked match ordered by that sum, so the matches closest to the
+threshold can be polled first:
+
+    watchlist.update_table(link, odds_table(odds_info))
+    for link, implied_sum in watchlist.top(20):
+        ...
+
+Each match keeps one indexed heap of provider prices per outcome and the
+matches sit in one indexed heap by their sum. A single provider price change
+updates one outcome heap, reads the two best prices per outcome and moves the
+match in the match heap: O(log providers + log matches), with no rescan.
+"""
+import heapq
+import math
+
+
+class IndexedHeap:
+    """
+    Binary min-heap of keys by priority, with a position index.
+
+    The index lets a key's priority be changed or the key be removed in
+    O(log n) instead of rebuilding the heap.
+    """
+
+    def __init__(self):
+        self._heap = []  # [priority, key] entries
+        self._position = {}  # key -> index in _heap
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, key):
+        return key in self._position
+
+    def priority(self, key):
+        """Return the priority of key. Raises KeyError if it is not in the heap."""
+        return self._heap[self._position[key]][0]
+
+    def set(self, key, priority):
+        """Insert key, or move it to its new priority."""
+        index = self._position.get(key)
+        if index is None:
+            self._heap.append([priority, key])
+            self._position[key] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return
+        previous = self._heap[index][0]
+        self._heap[index][0] = priority
+        if priority < previous:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def discard(self, key):
+        """Remove key if it is in the heap."""
+        index = self._position.pop(key, None)
+        if index is None:
+            return
+        last = self._heap.pop()
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._position[last[1]] = index
+            self._sift_down(self._sift_up(index))
+
+    def smallest(self, k):
+        """
+        Return the k lowest-priority entries in order.
+
+        Only the heap nodes next to the ones already taken are looked at, so this
+        costs O(k log k) however large the heap is.
+
+        Returns:
+            list: (key, priority) tuples.
+        """
+        heap = self._heap
+        result = []
+        frontier = [(heap[0][0], 0)] if heap and k > 0 else []
+        while frontier and len(result) < k:
+            priority, index = heapq.heappop(frontier)
+            result.append((heap[index][1], priority))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], child))
+        return result
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._position[heap[i][1]] = i
+        self._position[heap[j][1]] = j
+
+    def _sift_up(self, index):
+        heap = self._heap
+        while index > 0:
+            parent = (index - 1) // 2
+            if not heap[index][0] < heap[parent][0]:
+                break
+            self._swap(index, parent)
+            index = parent
+        return index
+
+    def _sift_down(self, index):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and heap[child][0] < heap[smallest][0]:
+                    smallest = child
+            if smallest == index:
+                return index
+            self._swap(index, smallest)
+            index = smallest
+
+
+class NearArbitrageWatchlist:
+    """
+    Track matches ordered by their best two-way implied-probability sum.
+
+    Matches without a valid pair of prices from two different providers are
+    kept out of the ranking until they get one.
+    """
+
+    def __init__(self):
+        # link -> {'teams', 'prices' (provider -> (implied1, implied2)), 'outcomes' (two IndexedHeaps)}
+        # An implied probability is None where the provider has no usable price
+        self.matches = {}
+        self.ranking = IndexedHeap()
+
+    def __len__(self):
+        return len(self.ranking)
+
+    def __contains__(self, link):
+        return link in self.ranking
+
+    def _state(self, link, teams=None):
+        state = self.matches.get(link)
+        if state is None:
+            state = self.matches[link] = {
+                'teams': tuple(teams) if teams is not None else None,
+                'prices': {},
+                'outcomes': (IndexedHeap(), IndexedHeap()),
+            }
+        elif teams is not None:
+            state['teams'] = tuple(teams)
+        return state
+
+    def _set_price(self, state, provider, odds):
+        """Update one provider's row of a match without re-ranking it."""
+        implied = None
+        if odds is not None:
+            # Missing (NaN) prices and odds of 1 or less cannot be bet on, as in solve_markets
+            implied = tuple(1 / float(price) if float(price) > 1 else None for price in odds[:2])
+            if implied == (None, None):
+                implied = None
+        if implied == state['prices'].get(provider):
+            return False
+        if implied is None:
+            del state['prices'][provider]
+        else:
+            state['prices'][provider] = implied
+        for heap, value in zip(state['outcomes'], implied or (None, None)):
+            if value is None:
+                heap.discard(provider)
+            else:
+                heap.set(provider, value)
+        return True
+
+    def _rank(self, link, state):
+        implied_sum = best_sum(*state['outcomes'])
+        if math.isinf(implied_sum):
+            self.ranking.discard(link)
+        else:
+            self.ranking.set(link, implied_sum)
+
+    def update_odds(self, link, provider, odds, teams=None):
+        """
+        Record one provider's price change for a match.
+
+        Args:
+            link (str): Match link.
+            provider (str): Provider name.
+            odds (sequence): (team 1 odds, team 2 odds), or None if the provider
+                no longer offers the match.
+            teams (sequence, optional): Team names, kept in matches[link]['teams'].
+        """
+        state = self._state(link, teams)
+        if self._set_price(state, provider, odds):
+            self._rank(link, state)
+
+    def update_table(self, link, table):
+        """
+        Record a fresh OddsTable of a match.
+
+        Only providers whose prices differ from the previous table are updated,
+        and the match is re-ranked once.
+        """
+        state = self._state(link, table.teams[:2])
+        # A provider listed twice is kept with its best price per outcome
+        latest = {}
+        for provider, (odds1, odds2) in zip(table.providers, table.odds[:, :2].tolist()):
+            previous = latest.get(provider)
+            latest[provider] = (odds1, odds2) if previous is None else (max(previous[0], odds1), max(previous[1], odds2))
+        changed = False
+        for provider in [provider for provider in state['prices'] if provider not in latest]:
+            changed |= self._set_price(state, provider, None)
+        for provider, odds in latest.items():
+            changed |= self._set_price(state, provider, odds)
+        if changed:
+            self._rank(link, state)
+
+    def remove(self, link):
+        """Stop tracking a match."""
+        self.matches.pop(link, None)
+        self.ranking.discard(link)
+
+    def implied_sum(self, link):
+        """Return the best implied-probability sum of a match (inf without a valid pair)."""
+        return self.ranking.priority(link) if link in self.ranking else math.inf
+
+    def top(self, k=20):
+        """
+        Return the k matches closest to (or deepest in) arbitrage.
+
+        Returns:
+            list: (link, implied sum) tuples, lowest sum first.
+        """
+        return self.ranking.smallest(k)
+
+
+def best_sum(outcome1, outcome2):
+    """
+    Return the lowest implied-probability sum over two different providers.
+
+    Only the two best prices per outcome can form the optimum: if both best
+    prices come from one provider, one of them is paired with the other
+    outcome's runner-up.
+
+    Args:
+        outcome1 (IndexedHeap): Provider -> implied probability of team 1.
+        outcome2 (IndexedHeap): Provider -> implied probability of team 2.
+
+    Returns:
+        float: The sum, or inf when no two providers cover both outcomes.
+    """
+    best1 = outcome1.smallest(2)
+    best2 = outcome2.smallest(2)
+    if not best1 or not best2:
+        return math.inf
+    (provider1, implied1), (provider2, implied2) = best1[0], best2[0]
+    if provider1 != provider2:
+        return implied1 + implied2
+    candidates = []
+    if len(best2) > 1:
+        candidates.append(implied1 + best2[1][1])
+    if len(best1) > 1:
+        candidates.append(best1[1][1] + implied2)
+    return min(candidates, default=math.inf)